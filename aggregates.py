@@ -0,0 +1,154 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from cube import rollup, slice_cube
+from fx import FxTable
+from groupby_log import record_groupby
+
+# Display mode showing each row's loss relative to its pre-tariff revenue instead of a currency
+PERCENT = 'Percent'
+
+
+def _scan(df, country, sector):
+    mask = np.ones(len(df), dtype=bool)
+    if country != "All":
+        mask &= (df['country'] == country).to_numpy()
+    if sector != "All":
+        mask &= (df['product_type'] == sector).to_numpy()
+    return None if mask.all() else np.flatnonzero(mask)
+
+
+class FilterIndex:
+    """Row positions of every (country, product_type) pair, factorized once per dataset.
+
+    A filter then becomes a dict lookup plus a concatenation of the matching groups
+    instead of string comparisons over the full columns.
+    """
+
+    def __init__(self, df):
+        self._groups = df.groupby(['country', 'product_type'], observed=True, dropna=False, sort=False).indices
+        record_groupby(['country', 'product_type'], len(df))
+        self._positions = {}
+
+    def positions(self, country="All", sector="All"):
+        """Sorted row positions matching the filters, or None when nothing is filtered out."""
+        if country == "All" and sector == "All":
+            return None
+        key = (country, sector)
+        if key not in self._positions:
+            parts = [
+                rows for (c, s), rows in self._groups.items()
+                if (country == "All" or c == country) and (sector == "All" or s == sector)
+            ]
+            self._positions[key] = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+        return self._positions[key]
+
+
+def compute_aggregates(df, cube, country="All", sector="All", currency='USD', fx=None, index=None, rows=None):
+    """Build every frame and KPI the app page renders for one filter combination.
+
+    Totals come from the aggregate cube, so their cost does not depend on the row
+    count. They are summed in USD and then converted to `currency` at the latest rate
+    in `fx` (or expressed as a percentage of Revenue_Before when currency is PERCENT);
+    the *_usd KPIs are not converted. The slice is grouped once, at the finest grain any
+    view needs, and each view regroups that small frame.
+
+    The `filtered` rows are never rescaled or copied column-wise: they are `df` itself
+    when no filter applies, else a row subset taken via `index` (or the already-taken
+    `rows` for this country and sector, when the caller has them).
+    """
+    cells = slice_cube(cube, country, sector)
+    if currency == PERCENT:
+        measure, rate = 'Revenue_Loss_Pct', 1.0
+    else:
+        measure, rate = 'Revenue_Loss_Abs', (fx or FxTable.from_file()).rate(currency)
+
+    # Missing keys are kept here so each view below still drops only its own
+    base = rollup(cells, ['Region', 'country', 'product_type'], [measure, 'Rows'], dropna=False)
+    base[measure] = base[measure] * rate
+    base = base.rename(columns={measure: 'Revenue_Loss_Abs'})
+
+    by_country = rollup(base, ['country'], ['Revenue_Loss_Abs', 'Rows']).rename(columns={'Rows': 'Active_Tariffs'})
+    by_sector = rollup(base, ['product_type'], ['Revenue_Loss_Abs'])
+    by_region_sector = rollup(base, ['Region', 'product_type'], ['Revenue_Loss_Abs'])
+
+    if rows is None:
+        positions = index.positions(country, sector) if index is not None else _scan(df, country, sector)
+        rows = df if positions is None else df.take(positions)
+
+    elasticity_count = cells['Elasticity_Count'].sum()
+    return {
+        'filtered': rows,
+        'by_country': by_country,
+        'by_sector': by_sector,
+        'by_region_sector': by_region_sector,
+        'kpi': {
+            'loss': cells[measure].sum() * rate,
+            'loss_usd': cells['Revenue_Loss_Abs'].sum(),
+            'revenue_before_usd': cells['Revenue_Before'].sum(),
+            'avg_elasticity': cells['Elasticity_Sum'].sum() / elasticity_count if elasticity_count else 0,
+            'n_countries': len(by_country),
+            'n_records': int(cells['Rows'].sum()),
+        },
+    }
+
+
+class AggregateCache:
+    """LRU cache of compute_aggregates() results keyed on (country, sector, currency).
+
+    Entries belong to one dataset and FX table version (the `data_version` attrs set by
+    the loaders, FxTable.version); a change to any of them drops everything cached so far.
+    Callers must treat the returned frames as read-only, they are shared across reruns.
+    One instance is shared by every session's script thread, so lookups, computation and
+    eviction run under a lock.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._version = None
+        self._index = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def version(self):
+        """(rows, cube, FX) versions the cached entries were computed from."""
+        return self._version
+
+    def get(self, df, cube, country="All", sector="All", currency='USD', fx=None):
+        fx = fx or FxTable.from_file()
+        with self._lock:
+            version = (df.attrs.get('data_version'), cube.attrs.get('data_version'), fx.version)
+            if version != self._version:
+                self._entries.clear()
+                # A new FX table alone leaves the rows, and so the filter index, untouched
+                if self._index is None or version[:2] != self._version[:2]:
+                    self._index = FilterIndex(df)
+                self._version = version
+
+            key = (country, sector, currency)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry
+
+            self.misses += 1
+            # The row subset does not depend on the currency, so share it with any cached sibling
+            rows = next((e['filtered'] for (c, s, _), e in self._entries.items() if (c, s) == (country, sector)), None)
+            entry = compute_aggregates(df, cube, country, sector, currency, fx, self._index, rows)
+            self._entries[key] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return entry
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
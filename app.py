@@ -2,19 +2,26 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import numpy as np
-import base64
+import os
 
-@st.cache_data
-def get_base64_of_bin_file(bin_file):
-    with open(bin_file, 'rb') as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
+from aggregates import AggregateCache, PERCENT
+from assets import asset_data_uri
+from cube import build_cube, revenue_loss_pct
+from downsample import downsample_scatter, render_mode
+from data_store import compact_frame, dataset_paths, read_cube, read_enriched
+from figure_cache import FigureCache
+from fx import DEFAULT_FX_PATH, FxTable
+from geo import CONTINENT_LABELS, ISO_A3, coords_of
+from geodesic import country_flows
+from groupby_log import start_groupby_log
+from hierarchy import build_hierarchy, cycle_colors
+from hot_reload import HotReloader
 
-try:
-    bg_img = get_base64_of_bin_file("image_6.png")
-except FileNotFoundError:
-    bg_img = ""
+# WebP data: URI from the asset cache ("" when the image is missing)
+bg_img = asset_data_uri("image_6.png")
+
+# Every groupby this rerun runs (aggregates, filter index, sunburst, scatter downsampling)
+groupbys = start_groupby_log()
 
 
 # =============================================================================
@@ -262,32 +269,73 @@ div[data-testid="column"] div[data-testid="stPlotlyChart"] iframe {{
 # =============================================================================
 # 2. DATA ENGINEERING
 # =============================================================================
-@st.cache_data
 def load_data():
-    try:
-        df = pd.read_csv("Tariff_Impact_Analysis_Enriched.csv")
+    df = read_enriched()
+
+    # Date parsing
+    if 'date' in df.columns:
+        df['date'] = pd.to_datetime(df['date'], dayfirst=True, errors='coerce')
+    elif 'Date' in df.columns:
+        df['date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
+
+    # Geo cleanup
+    if 'latitude' in df.columns and 'longitude' in df.columns:
+        df = df.dropna(subset=['latitude', 'longitude'])
+
+    # Derived metrics
+    df['Revenue_Loss_Abs'] = df['Revenue_Loss'].abs()
+    cap = df['Revenue_Loss_Abs'].quantile(0.95)
+    df['Revenue_Loss_Capped'] = df['Revenue_Loss_Abs'].clip(upper=cap)
+    df['Revenue_Loss_Pct'] = revenue_loss_pct(df)
+
+    # Categorical text columns and 32-bit numerics; filters then compare category codes
+    return compact_frame(df)
+
+def load_cube(df):
+    # Materialized by the ETL; rebuilt from the loaded rows if missing or stale
+    cube = read_cube()
+    if cube is None:
+        cube = build_cube(df)
+        cube.attrs['data_version'] = df.attrs.get('data_version')
+    return cube.dropna(subset=['latitude', 'longitude'])
+
+def load_snapshot():
+    df = load_data()
+    return df, (load_cube(df) if not df.empty else None)
+
+@st.cache_resource
+def get_dataset():
+    # Rows and cube shared by every rerun and session without being copied, so nothing below
+    # may mutate them. New ETL output is loaded in the background while this snapshot keeps serving.
+    return HotReloader(load_snapshot, dataset_paths())
+
+dataset = get_dataset()
+try:
+    df, cube = dataset.current()
+except Exception as e:
+    st.error(f"Data load failed: {e}")
+    df, cube = pd.DataFrame(), None
 
-        # Date parsing
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'], dayfirst=True, errors='coerce')
-        elif 'Date' in df.columns:
-            df['date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
+@st.cache_resource
+def get_aggregate_cache():
+    # One LRU shared by every session, so filter combinations viewed before come back instantly
+    return AggregateCache(maxsize=32)
 
-        # Geo cleanup
-        if 'latitude' in df.columns and 'longitude' in df.columns:
-            df = df.dropna(subset=['latitude', 'longitude'])
+aggregate_cache = get_aggregate_cache()
 
-        # Derived metrics
-        df['Revenue_Loss_Abs'] = df['Revenue_Loss'].abs()
-        cap = df['Revenue_Loss_Abs'].quantile(0.95)
-        df['Revenue_Loss_Capped'] = df['Revenue_Loss_Abs'].clip(upper=cap)
+@st.cache_resource
+def get_figure_cache():
+    # Serialized figures per chart and filter state, capped at 32 MB of JSON
+    return FigureCache(max_bytes=32 * 2**20)
 
-        return df
-    except Exception as e:
-        st.error(f"Data load failed: {e}")
-        return pd.DataFrame()
+figure_cache = get_figure_cache()
 
-df = load_data()
+@st.cache_resource
+def load_fx(mtime):
+    # Keyed on the file's mtime, so a newly published rate is picked up on the next rerun
+    return FxTable.from_file(DEFAULT_FX_PATH)
+
+fx = load_fx(os.path.getmtime(DEFAULT_FX_PATH))
 
 
 # =============================================================================
@@ -333,19 +381,22 @@ currency_options = [
 ]
 currency_display = st.sidebar.selectbox("Currency Display", currency_options, label_visibility="collapsed")
 
-# Apply filters
-filtered = df.copy()
-if selected_country != "All" and not filtered.empty:
-    filtered = filtered[filtered['country'] == selected_country]
-if selected_sector != "All" and not filtered.empty:
-    filtered = filtered[filtered['product_type'] == selected_sector]
+# Apply filters (cached per country / sector / currency combination)
+currency_code = currency_display.split()[0]
+if not df.empty:
+    agg = aggregate_cache.get(df, cube, selected_country, selected_sector, currency_code, fx)
+    figure_cache.sync(aggregate_cache.version)
+    filtered = agg['filtered']
+    kpi = agg['kpi']
+else:
+    filtered = df
 
 st.sidebar.divider()
 
 # ── Dynamic Status Card ──
 st.sidebar.markdown("<p class='filter-label' style='margin-bottom: 2px;'>CURRENT EXPOSURE LEVEL</p>", unsafe_allow_html=True)
 if not filtered.empty:
-    total_risk_usd = filtered['Revenue_Loss_Abs'].sum()
+    total_risk_usd = kpi['loss_usd']
     if total_risk_usd > 500_000_000:
         status_text = "STATUS: HIGH RISK"
         status_color = "#903234" # Ruby Rust
@@ -380,34 +431,31 @@ if st.sidebar.button("Reset All Filters", use_container_width=True):
 st.markdown("<div class='master-title'>GLOBAL TARIFF IMPACT ANALYSIS</div>", unsafe_allow_html=True)
 st.markdown("<div class='master-subtitle'>Analyzing US Economic Shifts and Global Market Vulnerability (2018-2025)</div>", unsafe_allow_html=True)
 
+def chart_key(chart):
+    return (chart, selected_country, selected_sector, currency_code)
+
 if not filtered.empty:
 
     # ── Currency Formatting Logic ──
-    rate = 1.0
     sym = "$"
     metric_suffix = "M"
     is_percent = False
 
-    if currency_display.startswith("EUR"):
-        rate = 0.92; sym = "€"
-    elif currency_display.startswith("GBP"):
-        rate = 0.79; sym = "£"
-    elif currency_display.startswith("JPY"):
-        rate = 150.0; sym = "¥"
-    elif currency_display.startswith("Percent"):
+    if currency_code == "EUR":
+        sym = "€"
+    elif currency_code == "GBP":
+        sym = "£"
+    elif currency_code == "JPY":
+        sym = "¥"
+    elif currency_code == PERCENT:
         sym = "%"
         is_percent = True
         metric_suffix = ""
 
     if is_percent:
-        denom = filtered['Revenue_Before'] if 'Revenue_Before' in filtered.columns else filtered['Revenue_Loss_Abs'] + 1
-        denom = denom.replace(0, np.nan)
-        kpi_1_val = (filtered['Revenue_Loss_Abs'].sum() / filtered['Revenue_Before'].sum() * 100) if 'Revenue_Before' in filtered.columns and filtered['Revenue_Before'].sum() > 0 else 0
+        kpi_1_val = (kpi['loss_usd'] / kpi['revenue_before_usd'] * 100) if kpi['revenue_before_usd'] > 0 else 0
         kpi_1_str = f"{kpi_1_val:,.1f}%"
-        
-        filtered['Revenue_Loss_Abs'] = (filtered['Revenue_Loss_Abs'] / denom) * 100
-        filtered['Revenue_Loss_Abs'] = filtered['Revenue_Loss_Abs'].fillna(0)
-        
+
         ht_val = "%{value:,.1f}%"
         ht_map = "%{customdata[1]:,.1f}%"
         cbar_tickformat = ",.1f"
@@ -416,8 +464,7 @@ if not filtered.empty:
         text_auto_format = ".1f"
         cbar_title = "RELATIVE<br>IMPACT"
     else:
-        filtered['Revenue_Loss_Abs'] = filtered['Revenue_Loss_Abs'] * rate
-        kpi_1_val = filtered['Revenue_Loss_Abs'].sum() / 1e6
+        kpi_1_val = kpi['loss'] / 1e6
         kpi_1_str = f"{sym}{kpi_1_val:,.1f}{metric_suffix}"
         
         ht_val = f"{sym}%{{value:,.0f}}"
@@ -431,9 +478,9 @@ if not filtered.empty:
     # ─────────────────────────────────────────────────────────────────────────
     # PART A — COMPRESSED KPIs
     # ─────────────────────────────────────────────────────────────────────────
-    avg_elasticity = filtered['Price_Elasticity_of_Demand'].mean() if 'Price_Elasticity_of_Demand' in filtered.columns else 0
-    n_countries    = filtered['country'].nunique() if 'country' in filtered.columns else 0
-    n_records      = len(filtered)
+    avg_elasticity = kpi['avg_elasticity']
+    n_countries    = kpi['n_countries']
+    n_records      = kpi['n_records']
 
     k1, k2, k3, k4 = st.columns(4)
     with k1:
@@ -471,169 +518,136 @@ if not filtered.empty:
         unsafe_allow_html=True
     )
 
-    iso_mapping = {
-        'USA': 'USA', 'China': 'CHN', 'Germany': 'DEU', 'Japan': 'JPN',
-        'India': 'IND', 'UK': 'GBR', 'France': 'FRA', 'Brazil': 'BRA',
-        'Australia': 'AUS', 'South Korea': 'KOR', 'Mexico': 'MEX', 'Canada': 'CAN',
-        'Portugal': 'PRT', 'South Africa': 'ZAF', 'Argentina': 'ARG',
-        'Norway': 'NOR', 'Egypt': 'EGY', 'Chile': 'CHL'
-    }
-
-    fixed_coords = {
-        'USA': (39.8283, -98.5795), 'China': (35.8617, 104.1954), 'Germany': (51.1657, 10.4515),
-        'Japan': (36.2048, 138.2529), 'India': (20.5937, 78.9629), 'UK': (55.3781, -3.4360),
-        'France': (46.2276, 2.2137), 'Brazil': (-14.2350, -51.9253), 'Australia': (-25.2744, 133.7751),
-        'South Korea': (35.9078, 127.7669), 'Mexico': (23.6345, -102.5528), 'Canada': (56.1304, -106.3468),
-        'Portugal': (39.3999, -8.2245), 'South Africa': (-30.5595, 22.9375), 'Argentina': (-38.4161, -63.6167),
-        'Norway': (60.4720, 8.4689), 'Egypt': (26.8206, 30.8025), 'Chile': (-35.6751, -71.5430)
-    }
-
-    geo_df = filtered.groupby('country').agg(
-        Revenue_Loss_Abs=('Revenue_Loss_Abs', 'sum'),
-        Active_Tariffs=('Revenue_Loss_Abs', 'count')
-    ).reset_index()
-    
-    geo_df['iso_a3'] = geo_df['country'].map(iso_mapping)
-    geo_df['latitude'] = geo_df['country'].map(lambda x: fixed_coords.get(x, (0, 0))[0])
-    geo_df['longitude'] = geo_df['country'].map(lambda x: fixed_coords.get(x, (0, 0))[1])
-
-    max_loss = geo_df['Revenue_Loss_Abs'].max() if len(geo_df) > 0 else 1
-
-    fig_map = go.Figure()
-
-    # Choropleth map
-    fig_map.add_trace(go.Choropleth(
-        locations=geo_df['iso_a3'],
-        z=geo_df['Revenue_Loss_Abs'],
-        colorscale=[[0, '#0BAEB7'], [1, '#004de6']], # Soft teal to deep vibrant blue
-        showscale=True,
-        marker_line_color='#113948',
-        marker_line_width=0.5,
-        hoverinfo='skip', # Disable default hover to use the bubble hover instead
-        colorbar=dict(
-            title=dict(text=cbar_title, font=dict(color="white", size=13, family="Inter")),
-            tickfont=dict(color="white", size=14, family="Inter"),
-            tickformat=cbar_tickformat,
-            tickprefix=cbar_tickprefix,
-            ticksuffix=cbar_ticksuffix,
-            thickness=24,
-            len=0.75,
-            x=0.985,
-            y=0.5,
-            bgcolor="rgba(17,57,72,0.6)",
-            outlinecolor="rgba(11, 174, 183, 0.6)",
-            outlinewidth=1,
-        )
-    ))
-
-    # Dynamic Opacity for Orbs based on financial damage intensity
-    colors_outer = [f'rgba(144, 50, 52, {0.05 + 0.15 * (v/max_loss):.2f})' for v in geo_df['Revenue_Loss_Abs']]
-    colors_mid   = [f'rgba(144, 50, 52, {0.10 + 0.35 * (v/max_loss):.2f})' for v in geo_df['Revenue_Loss_Abs']]
-    colors_core  = [f'rgba(144, 50, 52, {0.50 + 0.50 * (v/max_loss):.2f})' for v in geo_df['Revenue_Loss_Abs']]
-
-    # ── 2. Ruby Rust Impact Orbs (Aggressive pseudo-bloom effect) ──
-    # Outer bloom (faint, huge radius)
-    fig_map.add_trace(go.Scattergeo(
-        lat=geo_df['latitude'], lon=geo_df['longitude'],
-        mode='markers',
-        marker=dict(
-            size=(geo_df['Revenue_Loss_Abs'] / max_loss * 60 + 20).tolist(),
-            color=colors_outer,
-            sizemode='diameter', line=dict(width=0)
-        ),
-        showlegend=False, hoverinfo='skip'
-    ))
-
-    # Mid bloom
-    fig_map.add_trace(go.Scattergeo(
-        lat=geo_df['latitude'], lon=geo_df['longitude'],
-        mode='markers',
-        marker=dict(
-            size=(geo_df['Revenue_Loss_Abs'] / max_loss * 35 + 12).tolist(),
-            color=colors_mid,
-            sizemode='diameter', line=dict(width=0)
-        ),
-        showlegend=False, hoverinfo='skip'
-    ))
-
-    # Core orb (solid Ruby Rust)
-    fig_map.add_trace(go.Scattergeo(
-        lat=geo_df['latitude'], lon=geo_df['longitude'],
-        mode='markers',
-        marker=dict(
-            size=(geo_df['Revenue_Loss_Abs'] / max_loss * 16 + 8).tolist(),
-            color=colors_core,
-            sizemode='diameter',
-            line=dict(width=2.5, color='#04D5E7')  # Neon Cyan glow effect
-        ),
-        hovertemplate=(
-            f'<b>%{{customdata[0]}}</b><br>'
-            f'Impact: {ht_map}<br>'
-            f'Active Tariffs: %{{customdata[2]:,.0f}}<extra></extra>'
-        ),
-        customdata=list(zip(geo_df['country'], geo_df['Revenue_Loss_Abs'], geo_df['Active_Tariffs'])),
-        showlegend=False
-    ))
-
-    # ── 3. Thin Neon Cyan Connection Arcs (Trade lines) ──
-    top_hubs = geo_df.nlargest(10, 'Revenue_Loss_Abs')
-    if len(top_hubs) >= 2:
-        hub = top_hubs.iloc[0]
-        for _, spoke in top_hubs.iloc[1:].iterrows():
-            n_pts = 40
-            lats = np.linspace(hub['latitude'], spoke['latitude'], n_pts)
-            lons = np.linspace(hub['longitude'], spoke['longitude'], n_pts)
-            arc_h = abs(hub['longitude'] - spoke['longitude']) * 0.15
-            curve = arc_h * np.sin(np.linspace(0, np.pi, n_pts))
-            lats_c = lats + curve * 0.25
+    def build_hero_map():
+        geo_df = agg['by_country'].copy()
+
+        geo_df['iso_a3'] = geo_df['country'].map(ISO_A3)
+        geo_df['latitude'], geo_df['longitude'] = coords_of(geo_df['country'])
+
+        max_loss = geo_df['Revenue_Loss_Abs'].max() if len(geo_df) > 0 else 1
+
+        fig_map = go.Figure()
+
+        # Choropleth map
+        fig_map.add_trace(go.Choropleth(
+            locations=geo_df['iso_a3'],
+            z=geo_df['Revenue_Loss_Abs'],
+            colorscale=[[0, '#0BAEB7'], [1, '#004de6']], # Soft teal to deep vibrant blue
+            showscale=True,
+            marker_line_color='#113948',
+            marker_line_width=0.5,
+            hoverinfo='skip', # Disable default hover to use the bubble hover instead
+            colorbar=dict(
+                title=dict(text=cbar_title, font=dict(color="white", size=13, family="Inter")),
+                tickfont=dict(color="white", size=14, family="Inter"),
+                tickformat=cbar_tickformat,
+                tickprefix=cbar_tickprefix,
+                ticksuffix=cbar_ticksuffix,
+                thickness=24,
+                len=0.75,
+                x=0.985,
+                y=0.5,
+                bgcolor="rgba(17,57,72,0.6)",
+                outlinecolor="rgba(11, 174, 183, 0.6)",
+                outlinewidth=1,
+            )
+        ))
 
+        # Dynamic Opacity for Orbs based on financial damage intensity
+        colors_outer = [f'rgba(144, 50, 52, {0.05 + 0.15 * (v/max_loss):.2f})' for v in geo_df['Revenue_Loss_Abs']]
+        colors_mid   = [f'rgba(144, 50, 52, {0.10 + 0.35 * (v/max_loss):.2f})' for v in geo_df['Revenue_Loss_Abs']]
+        colors_core  = [f'rgba(144, 50, 52, {0.50 + 0.50 * (v/max_loss):.2f})' for v in geo_df['Revenue_Loss_Abs']]
+
+        # ── 2. Ruby Rust Impact Orbs (Aggressive pseudo-bloom effect) ──
+        # Outer bloom (faint, huge radius)
+        fig_map.add_trace(go.Scattergeo(
+            lat=geo_df['latitude'], lon=geo_df['longitude'],
+            mode='markers',
+            marker=dict(
+                size=(geo_df['Revenue_Loss_Abs'] / max_loss * 60 + 20).tolist(),
+                color=colors_outer,
+                sizemode='diameter', line=dict(width=0)
+            ),
+            showlegend=False, hoverinfo='skip'
+        ))
+
+        # Mid bloom
+        fig_map.add_trace(go.Scattergeo(
+            lat=geo_df['latitude'], lon=geo_df['longitude'],
+            mode='markers',
+            marker=dict(
+                size=(geo_df['Revenue_Loss_Abs'] / max_loss * 35 + 12).tolist(),
+                color=colors_mid,
+                sizemode='diameter', line=dict(width=0)
+            ),
+            showlegend=False, hoverinfo='skip'
+        ))
+
+        # Core orb (solid Ruby Rust)
+        fig_map.add_trace(go.Scattergeo(
+            lat=geo_df['latitude'], lon=geo_df['longitude'],
+            mode='markers',
+            marker=dict(
+                size=(geo_df['Revenue_Loss_Abs'] / max_loss * 16 + 8).tolist(),
+                color=colors_core,
+                sizemode='diameter',
+                line=dict(width=2.5, color='#04D5E7')  # Neon Cyan glow effect
+            ),
+            hovertemplate=(
+                f'<b>%{{customdata[0]}}</b><br>'
+                f'Impact: {ht_map}<br>'
+                f'Active Tariffs: %{{customdata[2]:,.0f}}<extra></extra>'
+            ),
+            customdata=list(zip(geo_df['country'], geo_df['Revenue_Loss_Abs'], geo_df['Active_Tariffs'])),
+            showlegend=False
+        ))
+
+        # ── 3. Thin Neon Cyan Connection Arcs (Trade lines) ──
+        # Great-circle routes from the top hub, cached per country pair, in one NaN-separated trace
+        top_hubs = geo_df.nlargest(10, 'Revenue_Loss_Abs')
+        if len(top_hubs) >= 2:
+            hub = top_hubs['country'].iloc[0]
+            arc_lats, arc_lons = country_flows([(hub, spoke) for spoke in top_hubs['country'].iloc[1:]])
             fig_map.add_trace(go.Scattergeo(
-                lat=lats_c.tolist(), lon=lons.tolist(),
+                lat=arc_lats, lon=arc_lons,
                 mode='lines',
                 line=dict(width=1.2, color='rgba(4, 213, 231, 0.50)'),
                 showlegend=False, hoverinfo='skip'
             ))
 
-    # Continental Navigation Labels
-    continent_labels = [
-        dict(lat=48, lon=-100, text='NORTH AMERICA'),
-        dict(lat=-15, lon=-58, text='SOUTH AMERICA'),
-        dict(lat=52, lon=15, text='EUROPE'),
-        dict(lat=5, lon=22, text='AFRICA'),
-        dict(lat=42, lon=85, text='ASIA'),
-        dict(lat=-25, lon=135, text='OCEANIA'),
-    ]
-    for lbl in continent_labels:
+        # Continental Navigation Labels (one text trace)
         fig_map.add_trace(go.Scattergeo(
-            lat=[lbl['lat']], lon=[lbl['lon']],
+            lat=[lbl['lat'] for lbl in CONTINENT_LABELS], lon=[lbl['lon'] for lbl in CONTINENT_LABELS],
             mode='text',
-            text=[lbl['text']],
+            text=[lbl['text'] for lbl in CONTINENT_LABELS],
             textfont=dict(color='#8B949E', size=10, family='Inter'),
             showlegend=False, hoverinfo='skip'
         ))
 
-    # Map layout config
-    fig_map.update_geos(
-        projection_type='equirectangular',
-        showocean=True, oceancolor='#113948',
-        showland=True, landcolor='#0A232D',
-        showcountries=True, countrycolor='#113948', countrywidth=0.5,
-        showcoastlines=True, coastlinecolor='#113948', coastlinewidth=0.5,
-        showlakes=False,
-        showframe=False,
-        bgcolor='#113948'
-    )
+        # Map layout config
+        fig_map.update_geos(
+            projection_type='equirectangular',
+            showocean=True, oceancolor='#113948',
+            showland=True, landcolor='#0A232D',
+            showcountries=True, countrycolor='#113948', countrywidth=0.5,
+            showcoastlines=True, coastlinecolor='#113948', coastlinewidth=0.5,
+            showlakes=False,
+            showframe=False,
+            bgcolor='#113948'
+        )
 
-    if selected_country != "All":
-        fig_map.update_geos(fitbounds="locations")
+        if selected_country != "All":
+            fig_map.update_geos(fitbounds="locations")
 
-    fig_map.update_layout(
-        margin=dict(l=0, r=0, t=0, b=0),
-        height=525,
-        plot_bgcolor='#113948',
-        paper_bgcolor='#113948',
-    )
+        fig_map.update_layout(
+            margin=dict(l=0, r=0, t=0, b=0),
+            height=525,
+            plot_bgcolor='#113948',
+            paper_bgcolor='#113948',
+        )
+        return fig_map
 
+    fig_map = figure_cache.get_or_build(chart_key('hero_map'), build_hero_map)
     st.plotly_chart(fig_map, use_container_width=True, key='hero_map')
 
     st.markdown("<hr class='section-divider'>", unsafe_allow_html=True)
@@ -661,192 +675,174 @@ if not filtered.empty:
     with row1_left:
         if 'product_type' in filtered.columns:
             # Aggregate financial damage by sector
-            sector_df = filtered.groupby('product_type')['Revenue_Loss_Abs'].sum().reset_index()
-            sector_df = sector_df.sort_values('Revenue_Loss_Abs', ascending=False)
-
-            labels = sector_df['product_type'].tolist()
-            values = sector_df['Revenue_Loss_Abs'].tolist()
-            max_damage = max(values) if values else 0
-
-            # Dynamic pull: explode the highest-damage sector
-            pull_vals = [0.2 if v == max_damage else 0 for v in values]
-
-            # Colors: Ruby Rust for exploded, Cyan/Teal shades for the rest
-            oceanic_shades = ['#04D5E7', '#00b4d8', '#0096c7', '#0077b6', '#023e8a', '#0BAEB7']
-            colors = [RUBY if v == max_damage else oceanic_shades[i % len(oceanic_shades)] for i, v in enumerate(values)]
-
-            fig_donut = go.Figure(go.Pie(
-                labels=labels,
-                values=values,
-                hole=0.4,
-                pull=pull_vals,
-                marker=dict(colors=colors, line=dict(color='#0A1921', width=2)),
-                textinfo='percent',
-                textposition='outside',
-                automargin=True,
-                textfont=dict(color='#FFFFFF', size=11, family='Inter'),
-                hovertemplate=f'<b>%{{label}}</b><br>Impact: {ht_val}<br>Share: %{{percent}}<extra></extra>',
-                sort=False
-            ))
-
-            fig_donut.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='#0A1921',
-                font=dict(color=TEXT_COLOR, family="Inter"),
-                margin=dict(l=10, r=10, t=55, b=10),
-                title=dict(
-                    text="MARKET VULNERABILITY: SECTOR BREAKDOWN",
-                    font=dict(size=16, color=TEXT_COLOR, family="Inter"),
-                    x=0.5, xanchor='center', y=0.95
-                ),
-                height=CHART_HEIGHT,
-                showlegend=True,
-                legend=dict(
-                    orientation='v',
-                    yanchor='middle',
-                    y=0.5,
-                    xanchor='left',
-                    x=1.05,
-                    font=dict(size=10, color=TEXT_COLOR),
-                    bgcolor='rgba(0,0,0,0)'
+            def build_sector_donut():
+                sector_df = agg['by_sector'].sort_values('Revenue_Loss_Abs', ascending=False)
+
+                labels = sector_df['product_type'].tolist()
+                values = sector_df['Revenue_Loss_Abs'].tolist()
+                max_damage = max(values) if values else 0
+
+                # Dynamic pull: explode the highest-damage sector
+                pull_vals = [0.2 if v == max_damage else 0 for v in values]
+
+                # Colors: Ruby Rust for exploded, Cyan/Teal shades for the rest
+                oceanic_shades = ['#04D5E7', '#00b4d8', '#0096c7', '#0077b6', '#023e8a', '#0BAEB7']
+                colors = [RUBY if v == max_damage else oceanic_shades[i % len(oceanic_shades)] for i, v in enumerate(values)]
+
+                fig_donut = go.Figure(go.Pie(
+                    labels=labels,
+                    values=values,
+                    hole=0.4,
+                    pull=pull_vals,
+                    marker=dict(colors=colors, line=dict(color='#0A1921', width=2)),
+                    textinfo='percent',
+                    textposition='outside',
+                    automargin=True,
+                    textfont=dict(color='#FFFFFF', size=11, family='Inter'),
+                    hovertemplate=f'<b>%{{label}}</b><br>Impact: {ht_val}<br>Share: %{{percent}}<extra></extra>',
+                    sort=False
+                ))
+
+                fig_donut.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='#0A1921',
+                    font=dict(color=TEXT_COLOR, family="Inter"),
+                    margin=dict(l=10, r=10, t=55, b=10),
+                    title=dict(
+                        text="MARKET VULNERABILITY: SECTOR BREAKDOWN",
+                        font=dict(size=16, color=TEXT_COLOR, family="Inter"),
+                        x=0.5, xanchor='center', y=0.95
+                    ),
+                    height=CHART_HEIGHT,
+                    showlegend=True,
+                    legend=dict(
+                        orientation='v',
+                        yanchor='middle',
+                        y=0.5,
+                        xanchor='left',
+                        x=1.05,
+                        font=dict(size=10, color=TEXT_COLOR),
+                        bgcolor='rgba(0,0,0,0)'
+                    )
                 )
-            )
+                return fig_donut
 
+            fig_donut = figure_cache.get_or_build(chart_key('sector_donut'), build_sector_donut)
             st.plotly_chart(fig_donut, use_container_width=True, key="timeline")
 
     # ── TOP-RIGHT: Price Sensitivity (Cyan Bubbles) ──
     with row1_right:
         if 'Price_Delta_Pct' in filtered.columns and 'Volume_Delta_Pct' in filtered.columns:
-            fig_sc = px.scatter(
-                filtered,
-                x='Price_Delta_Pct',
-                y='Volume_Delta_Pct',
-                size='Revenue_Loss_Abs',
-                color='product_type' if 'product_type' in filtered.columns else None,
-                hover_name='product_name' if 'product_name' in filtered.columns else None,
-                color_discrete_sequence=[CYAN, '#00e5cc', '#00b4d8', '#0096c7', '#0077b6', RUBY],
-                size_max=45,
-                opacity=0.8
-            )
-            fig_sc.update_layout(**layout_dark, title=dict(text="Price Sensitivity Analysis", font=dict(size=22, color=TEXT_COLOR, family="Inter"), x=0.5, xanchor='center', y=0.92), height=CHART_HEIGHT, showlegend=False,
-                                 xaxis_title="Price Increase (%)", yaxis_title="Volume Drop (%)")
-            fig_sc.update_xaxes(showgrid=True, gridcolor=GRID_LINE, color='#8d99ae', zeroline=False, title_font=dict(color='#FFFFFF', size=14, family='Inter'))
-            fig_sc.update_yaxes(showgrid=True, gridcolor=GRID_LINE, color='#8d99ae', zeroline=False, title_font=dict(color='#FFFFFF', size=14, family='Inter'))
+            def build_price_sensitivity():
+                # Marker sizes are relative, so only the percent view needs a different column
+                size_col = 'Revenue_Loss_Pct' if is_percent else 'Revenue_Loss_Abs'
+                sector_col = 'product_type' if 'product_type' in filtered.columns else None
+                # Large selections are thinned server-side; outliers and the biggest bubbles are always kept
+                positions = downsample_scatter(filtered, 'Price_Delta_Pct', 'Volume_Delta_Pct', by=sector_col, size=size_col)
+                points = filtered if positions is None else filtered.take(positions)
+                # Rows stay in USD; only the few plotted points are converted for the hover value
+                loss_shown = points[size_col] * (1.0 if is_percent else fx.rate(currency_code))
+                fig_sc = px.scatter(
+                    points,
+                    x='Price_Delta_Pct',
+                    y='Volume_Delta_Pct',
+                    size=size_col,
+                    labels={'Revenue_Loss_Pct': 'Revenue_Loss_Abs'},
+                    color=sector_col,
+                    hover_name='product_name' if 'product_name' in filtered.columns else None,
+                    custom_data=[loss_shown.rename('Revenue_Loss_Shown')],
+                    color_discrete_sequence=[CYAN, '#00e5cc', '#00b4d8', '#0096c7', '#0077b6', RUBY],
+                    size_max=45,
+                    opacity=0.8,
+                    render_mode=render_mode(len(points))
+                )
+                loss_format = "%{customdata[0]:,.1f}%" if is_percent else f"{sym}%{{customdata[0]:,.0f}}"
+                fig_sc.for_each_trace(lambda t: t.update(hovertemplate=t.hovertemplate.replace('%{marker.size}', loss_format)))
+                if positions is not None:
+                    fig_sc.add_annotation(text=f"Showing {len(points):,} of {len(filtered):,} transactions",
+                                          xref='paper', yref='paper', x=1, y=1.02, showarrow=False,
+                                          font=dict(size=11, color='#8d99ae'))
+                fig_sc.update_layout(**layout_dark, title=dict(text="Price Sensitivity Analysis", font=dict(size=22, color=TEXT_COLOR, family="Inter"), x=0.5, xanchor='center', y=0.92), height=CHART_HEIGHT, showlegend=False,
+                                     xaxis_title="Price Increase (%)", yaxis_title="Volume Drop (%)")
+                fig_sc.update_xaxes(showgrid=True, gridcolor=GRID_LINE, color='#8d99ae', zeroline=False, title_font=dict(color='#FFFFFF', size=14, family='Inter'))
+                fig_sc.update_yaxes(showgrid=True, gridcolor=GRID_LINE, color='#8d99ae', zeroline=False, title_font=dict(color='#FFFFFF', size=14, family='Inter'))
+                return fig_sc
+
+            fig_sc = figure_cache.get_or_build(chart_key('price_sensitivity'), build_price_sensitivity)
             st.plotly_chart(fig_sc, use_container_width=True, key="sensitivity")
 
     row2_left, row2_right = st.columns(2)
 
     # ── BOTTOM-LEFT: Top 5 Risk Markets (Cyan → Ruby gradient) ──
     with row2_left:
-        top5 = filtered.groupby('country')['Revenue_Loss_Abs'].sum().reset_index()
-        top5 = top5.sort_values('Revenue_Loss_Abs', ascending=False).head(5)
-        fig_vbar = px.bar(
-            top5,
-            x='country',
-            y='Revenue_Loss_Abs',
-            color='Revenue_Loss_Abs',
-            color_continuous_scale=[CYAN, RUBY]
-        )
-        fig_vbar.update_layout(**layout_dark, title=dict(text="Top 5 Risk Markets", font=dict(size=22, color=TEXT_COLOR, family="Inter"), x=0.5, xanchor='center', y=0.92), height=CHART_HEIGHT, coloraxis_showscale=False,
-                               xaxis_title="", yaxis_title="")
-        fig_vbar.update_yaxes(showgrid=True, gridcolor=GRID_LINE, showticklabels=False, range=[0, top5['Revenue_Loss_Abs'].max() * 1.25])
-        fig_vbar.update_xaxes(color='#FFFFFF', tickfont=dict(color='#FFFFFF', size=12, family='Inter'))
-        fig_vbar.update_traces(texttemplate=f"{cbar_tickprefix}%{{y:{text_auto_format}}}{cbar_ticksuffix}", textposition='outside', textfont_color=TEXT_COLOR, textfont_size=11)
+        def build_risk_markets():
+            top5 = agg['by_country'].sort_values('Revenue_Loss_Abs', ascending=False).head(5)
+            fig_vbar = px.bar(
+                top5,
+                x='country',
+                y='Revenue_Loss_Abs',
+                color='Revenue_Loss_Abs',
+                color_continuous_scale=[CYAN, RUBY]
+            )
+            fig_vbar.update_layout(**layout_dark, title=dict(text="Top 5 Risk Markets", font=dict(size=22, color=TEXT_COLOR, family="Inter"), x=0.5, xanchor='center', y=0.92), height=CHART_HEIGHT, coloraxis_showscale=False,
+                                   xaxis_title="", yaxis_title="")
+            fig_vbar.update_yaxes(showgrid=True, gridcolor=GRID_LINE, showticklabels=False, range=[0, top5['Revenue_Loss_Abs'].max() * 1.25])
+            fig_vbar.update_xaxes(color='#FFFFFF', tickfont=dict(color='#FFFFFF', size=12, family='Inter'))
+            fig_vbar.update_traces(texttemplate=f"{cbar_tickprefix}%{{y:{text_auto_format}}}{cbar_ticksuffix}", textposition='outside', textfont_color=TEXT_COLOR, textfont_size=11)
+            return fig_vbar
+
+        fig_vbar = figure_cache.get_or_build(chart_key('risk_markets'), build_risk_markets)
         st.plotly_chart(fig_vbar, use_container_width=True, key="risk_markets")
 
     # ── BOTTOM-RIGHT: Sunburst — Geopolitical Risk Sector Hierarchy ──
     with row2_right:
         if 'country' in filtered.columns and 'product_type' in filtered.columns:
-            region_map = {
-                'USA': 'North America', 'Canada': 'North America', 'Mexico': 'North America',
-                'China': 'Asia', 'Japan': 'Asia', 'India': 'Asia', 'South Korea': 'Asia',
-                'Germany': 'Europe', 'UK': 'Europe', 'France': 'Europe', 'Portugal': 'Europe', 'Norway': 'Europe',
-                'Brazil': 'South America', 'Argentina': 'South America', 'Chile': 'South America',
-                'Australia': 'Oceania',
-                'South Africa': 'Africa', 'Egypt': 'Africa'
-            }
-            if 'Region' not in filtered.columns:
-                filtered['Region'] = filtered['country'].map(region_map).fillna('Other')
-
             # Build hierarchy: World → Region → Product Sector
-            sun_df = filtered.groupby(['Region', 'product_type'])['Revenue_Loss_Abs'].sum().reset_index()
-
-            ids = []
-            labels = []
-            parents = []
-            values = []
-
-            # Root node
-            world_total = sun_df['Revenue_Loss_Abs'].sum()
-            ids.append('World')
-            labels.append('World')
-            parents.append('')
-            values.append(world_total)
-
-            # Mid-ring: Regions
-            region_totals = sun_df.groupby('Region')['Revenue_Loss_Abs'].sum().to_dict()
-            for region in region_totals:
-                ids.append(region)
-                labels.append(region)
-                parents.append('World')
-                values.append(region_totals[region])
-
-            # Outer ring: Sectors within regions
-            for _, row in sun_df.iterrows():
-                node_id = f"{row['Region']} - {row['product_type']}"
-                ids.append(node_id)
-                labels.append(row['product_type'])
-                parents.append(row['Region'])
-                values.append(row['Revenue_Loss_Abs'])
-
-            # Color logic: Ruby for max damage leaf, Oceanic gradient for rest
-            max_val = max(values[1:]) if len(values) > 1 else 0
-            oceanic = ['#04D5E7', '#00b4d8', '#0096c7', '#0077b6', '#023e8a', '#0BAEB7', '#48cae4', '#90e0ef']
-            node_colors = []
-            color_idx = 0
-            for i, v in enumerate(values):
-                if i == 0:
-                    node_colors.append('rgba(10,25,33,0.3)')  # Root: transparent
-                elif v == max_val and v > 0:
-                    node_colors.append(RUBY)
-                else:
-                    node_colors.append(oceanic[color_idx % len(oceanic)])
-                    color_idx += 1
-
-            fig_sun = go.Figure(go.Sunburst(
-                ids=ids,
-                labels=labels,
-                parents=parents,
-                values=values,
-                branchvalues='total',
-                marker=dict(colors=node_colors, line=dict(color='#0A1921', width=1.5)),
-                hovertemplate=f'<b>%{{label}}</b><br>Impact: {ht_val}<extra></extra>',
-                textfont=dict(size=10, color=TEXT_COLOR),
-                insidetextorientation='radial'
-            ))
-
-            fig_sun.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='#0A1921',
-                font=dict(color=TEXT_COLOR, family="Inter"),
-                margin=dict(l=5, r=5, t=50, b=5),
-                title=dict(
-                    text="GEOPOLITICAL RISK: SECTOR HIERARCHY",
-                    font=dict(size=16, color=TEXT_COLOR, family="Inter"),
-                    x=0.5, xanchor='center', y=0.97
-                ),
-                height=CHART_HEIGHT
-            )
+            def build_sector_hierarchy():
+                # World -> Region -> sector rings; deeper levels only need more columns here
+                tree = build_hierarchy(agg['by_region_sector'], ['Region', 'product_type'], 'Revenue_Loss_Abs')
+
+                # Color logic: Ruby for max damage node, Oceanic gradient for rest, transparent root
+                oceanic = ['#04D5E7', '#00b4d8', '#0096c7', '#0077b6', '#023e8a', '#0BAEB7', '#48cae4', '#90e0ef']
+                node_colors = cycle_colors(tree['values'], oceanic, RUBY, 'rgba(10,25,33,0.3)')
+
+                fig_sun = go.Figure(go.Sunburst(
+                    ids=tree['ids'],
+                    labels=tree['labels'],
+                    parents=tree['parents'],
+                    values=tree['values'],
+                    branchvalues='total',
+                    marker=dict(colors=node_colors, line=dict(color='#0A1921', width=1.5)),
+                    hovertemplate=f'<b>%{{label}}</b><br>Impact: {ht_val}<extra></extra>',
+                    textfont=dict(size=10, color=TEXT_COLOR),
+                    insidetextorientation='radial'
+                ))
+
+                fig_sun.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='#0A1921',
+                    font=dict(color=TEXT_COLOR, family="Inter"),
+                    margin=dict(l=5, r=5, t=50, b=5),
+                    title=dict(
+                        text="GEOPOLITICAL RISK: SECTOR HIERARCHY",
+                        font=dict(size=16, color=TEXT_COLOR, family="Inter"),
+                        x=0.5, xanchor='center', y=0.97
+                    ),
+                    height=CHART_HEIGHT
+                )
+                return fig_sun
 
+            fig_sun = figure_cache.get_or_build(chart_key('sector_hierarchy'), build_sector_hierarchy)
             st.plotly_chart(fig_sun, use_container_width=True, key="sector_mix")
 
     # ─────────────────────────────────────────────────────────────────────────
     # PART D — EXECUTIVE SUMMARY
     # ─────────────────────────────────────────────────────────────────────────
     if not filtered.empty:
-        highest_country = filtered.groupby('country')['Revenue_Loss_Abs'].sum().idxmax()
-        highest_value = filtered.groupby('country')['Revenue_Loss_Abs'].sum().max()
-        highest_sector = filtered.groupby('product_type')['Revenue_Loss_Abs'].sum().idxmax()
+        country_totals = agg['by_country'].set_index('country')['Revenue_Loss_Abs']
+        highest_country = country_totals.idxmax()
+        highest_value = country_totals.max()
+        highest_sector = agg['by_sector'].set_index('product_type')['Revenue_Loss_Abs'].idxmax()
         
         highest_val_str = f"{highest_value:,.1f}%" if is_percent else f"{sym}{highest_value:,.0f}"
 
@@ -860,3 +856,18 @@ if not filtered.empty:
 
 else:
     st.error("⚠ System Initialization Failed: Dataset Empty or Filters Returned No Data.")
+
+agg_stats, fig_stats = aggregate_cache.stats(), figure_cache.stats()
+st.sidebar.caption(f"Aggregate cache: {agg_stats['hits']} hits · {agg_stats['misses']} misses · "
+                   f"{agg_stats['size']}/{agg_stats['maxsize']} entries")
+st.sidebar.caption(f"Figure cache: {fig_stats['hits']} hits · {fig_stats['misses']} misses · "
+                   f"{fig_stats['bytes'] / 2**20:.1f} MB")
+if dataset.reloading:
+    st.sidebar.caption("New data found, loading in the background…")
+elif dataset.last_error is not None:
+    st.sidebar.caption(f"Data reload failed, showing the previous snapshot: {dataset.last_error}")
+if 'memory_mb' in df.attrs:
+    st.sidebar.caption(f"Dataset in memory: {df.attrs['memory_mb'][1]:,.2f} MB "
+                       f"(was {df.attrs['memory_mb'][0]:,.2f} MB before compaction)")
+# Only work this session's rerun did; aggregates and figures served from the caches add none
+st.sidebar.caption(f"Groupbys this rerun: {len(groupbys)} · {sum(n for _, n in groupbys):,} rows grouped")
@@ -0,0 +1,82 @@
+import base64
+import glob
+import hashlib
+import io
+import os
+
+from PIL import Image
+
+# Encoded copies of the dashboards' static images, named by content hash (safe to delete)
+ASSET_CACHE_DIR = ".asset_cache"
+ASSET_FORMAT = 'webp'
+
+# Width of the gallery thumbnails, in pixels
+THUMBNAIL_WIDTH = 360
+
+# data: URIs already built in this process, keyed on the source file's path, mtime and size
+_DATA_URIS = {}
+
+
+def _save_options(source_format, resized):
+    # Full-size charts and other PNGs stay pixel-exact; photos and thumbnails are re-encoded lossily
+    if source_format == 'PNG' and not resized:
+        return {'lossless': True, 'method': 6}
+    return {'quality': 80, 'method': 6}
+
+
+def encode_asset(path, cache_dir=ASSET_CACHE_DIR, max_width=None):
+    """Path of the WebP copy of image `path` in `cache_dir`, encoding it only if not cached yet.
+
+    The copy is named after a hash of the source bytes, so an edited image gets a new
+    file while an unchanged one is reused across restarts. With `max_width` the copy is
+    a thumbnail scaled down to at most that many pixels wide.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    size = f".w{max_width}" if max_width else ""
+    out_path = os.path.join(cache_dir, f"{stem}.{digest}{size}.{ASSET_FORMAT}")
+    if not os.path.exists(out_path):
+        os.makedirs(cache_dir, exist_ok=True)
+        with Image.open(io.BytesIO(data)) as image:
+            resized = bool(max_width) and image.width > max_width
+            options = _save_options(image.format, resized)
+            if resized:
+                image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+            tmp_path = out_path + ".tmp"
+            image.save(tmp_path, ASSET_FORMAT.upper(), **options)
+        os.replace(tmp_path, out_path)
+    return out_path
+
+
+def asset_data_uri(path, cache_dir=ASSET_CACHE_DIR, max_width=None):
+    """WebP data: URI for image `path` (a thumbnail with `max_width`), or "" if it does not exist.
+
+    Built once per file version and process; later calls only stat the source file.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return ""
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, cache_dir, max_width)
+    uri = _DATA_URIS.get(key)
+    if uri is None:
+        with open(encode_asset(path, cache_dir, max_width), 'rb') as f:
+            uri = f"data:image/{ASSET_FORMAT};base64," + base64.b64encode(f.read()).decode()
+        _DATA_URIS[key] = uri
+    return uri
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Pre-encode the dashboards' static images into the asset cache.")
+    parser.add_argument("paths", nargs="*", default=["Source/*.png", "image_6.png"], help="image files or glob patterns")
+    parser.add_argument("--cache-dir", default=ASSET_CACHE_DIR)
+    args = parser.parse_args()
+    for pattern in args.paths:
+        for path in sorted(glob.glob(pattern)):
+            out_path = encode_asset(path, args.cache_dir)
+            thumb_path = encode_asset(path, args.cache_dir, THUMBNAIL_WIDTH)
+            print(f"{path}: {os.path.getsize(path):,} -> {os.path.getsize(out_path):,} bytes, "
+                  f"thumbnail {os.path.getsize(thumb_path):,} bytes")
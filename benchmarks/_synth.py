@@ -0,0 +1,31 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_CSV = os.path.join(BASE_DIR, "Tariff_Impact_Analysis_2025.csv")
+
+
+def synthetic_raw(n_rows, seed=0, columns=None):
+    """Resample the shipped raw dataset up to `n_rows` customs lines."""
+    base = pd.read_csv(RAW_CSV)
+    if columns is not None:
+        base = base[columns]
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(base), size=n_rows)
+    return base.take(idx).reset_index(drop=True)
+
+
+
+def write_synthetic_raw(path, n_rows, seed=0, batch=1_000_000):
+    """Write a raw CSV of `n_rows` lines in batches so the generator itself stays small."""
+    base = pd.read_csv(RAW_CSV, dtype=str, keep_default_na=False)
+    rng = np.random.default_rng(seed)
+    written = 0
+    while written < n_rows:
+        n = min(batch, n_rows - written)
+        part = base.take(rng.integers(0, len(base), size=n))
+        part.to_csv(path, mode='w' if written == 0 else 'a', header=written == 0, index=False)
+        written += n
+    return path
@@ -0,0 +1,77 @@
+"""Slice latency of the dashboard rollups, row-level groupbys vs. the aggregate cube.
+
+Run from the repository root:
+    python -m benchmarks.bench_cube [--sizes 600 100000 1000000 10000000] [--repeat 5]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from aggregates import compute_aggregates
+from benchmarks._synth import synthetic_raw
+from cube import build_cube
+from enrich_data import enrich_frame
+from macro import load_macro_table
+from trade_rules import TradeRuleRegistry
+
+SLICES = [("All", "All"), ("China", "All"), ("All", "Electronics"), ("USA", "Automobiles")]
+
+
+def row_level(df, country, sector):
+    # What app.py computed per rerun before the cube: filter the rows, then group them
+    filtered = df
+    if country != "All":
+        filtered = filtered[filtered['country'] == country]
+    if sector != "All":
+        filtered = filtered[filtered['product_type'] == sector]
+    return (
+        filtered.groupby('country', observed=True)['Revenue_Loss_Abs'].agg(['sum', 'count']),
+        filtered.groupby('product_type', observed=True)['Revenue_Loss_Abs'].sum(),
+        filtered.assign(Region=filtered['country']).groupby(['Region', 'product_type'], observed=True)['Revenue_Loss_Abs'].sum(),
+    )
+
+
+def cube_level(cube, country, sector):
+    out = compute_aggregates(cube.iloc[:0], cube, country, sector)
+    return out['by_country'], out['by_sector'], out['by_region_sector']
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for country, sector in SLICES:
+            fn(country, sector)
+        times.append((time.perf_counter() - start) / len(SLICES))
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[600, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    registry = TradeRuleRegistry.from_file()
+    macro_table = load_macro_table()
+    print(f"{'rows':>12} {'cube cells':>11} {'build s':>8} {'rows ms/slice':>14} {'cube ms/slice':>14}")
+    for n in args.sizes:
+        df = enrich_frame(synthetic_raw(n), registry, macro_table, verbose=False)
+        df['Revenue_Loss_Abs'] = df['Revenue_Loss'].abs()
+        start = time.perf_counter()
+        cube = build_cube(df)
+        t_build = time.perf_counter() - start
+
+        by_rows = row_level(df, "All", "All")[1]
+        by_cube = cube_level(cube, "All", "All")[1].set_index('product_type')['Revenue_Loss_Abs']
+        assert np.allclose(by_rows.sort_index().to_numpy(), by_cube.sort_index().to_numpy(), rtol=1e-6)
+
+        t_rows = best_of(lambda c, s: row_level(df, c, s), args.repeat)
+        t_cube = best_of(lambda c, s: cube_level(cube, c, s), args.repeat)
+        print(f"{n:>12,} {len(cube):>11,} {t_build:>8.2f} {t_rows * 1e3:>14.2f} {t_cube * 1e3:>14.2f}")
+        del df, cube
+
+
+if __name__ == "__main__":
+    main()
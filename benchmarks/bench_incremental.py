@@ -0,0 +1,53 @@
+"""Daily refresh cost: full enrich_data() vs. enrich_incremental() after appending a day of rows.
+
+Run from the repository root:
+    python -m benchmarks.bench_incremental [--history 1000000] [--delta 10000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks._synth import write_synthetic_raw
+from enrich_data import enrich_data, enrich_incremental
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--history', type=int, default=1_000_000)
+    parser.add_argument('--delta', type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = os.path.join(tmp, "raw.csv")
+        store = os.path.join(tmp, "store.csv")
+        write_synthetic_raw(raw, args.history)
+        t_initial = timed(enrich_data, raw, store)
+
+        # Append one "day" of shipments to the raw file
+        day = os.path.join(tmp, "day.csv")
+        write_synthetic_raw(day, args.delta, seed=1)
+        with open(day) as src, open(raw, 'a') as dst:
+            next(src)
+            shutil.copyfileobj(src, dst)
+
+        t_incremental = timed(enrich_incremental, raw, store)
+        t_full = timed(enrich_data, raw, os.path.join(tmp, "full.csv"))
+
+    print(f"history {args.history:,} rows (initial build {t_initial:.1f}s), appended {args.delta:,} rows")
+    print(f"  full rebuild      {t_full:8.1f}s")
+    print(f"  incremental merge {t_incremental:8.1f}s  ({t_full / t_incremental:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
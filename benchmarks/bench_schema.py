@@ -0,0 +1,87 @@
+"""Query latency before and after the schema migration: the original flat, unindexed layout of
+`Structure of DBS.sql`, the flat table with tariff_db's covering indexes, and the normalized schema.
+
+Run from the repository root:
+    python -m benchmarks.bench_schema [--sizes 600 100000 1000000] [--repeat 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks._synth import write_synthetic_raw
+from migrate_schema import ISO_DATE, NORMALIZED_HYPOTHESES, migrate
+from tariff_db import HYPOTHESES, INDEXES, connect, create_indexes, load_csv, run_hypotheses
+
+# Country, product type and date range of the dashboard-style slices
+SLICES = [("China", "Electronics", "2019-01-01", "2019-12-31"),
+          ("USA", "Automobiles", "2024-01-01", "2025-12-31"),
+          ("Germany", "Food", "2018-06-01", "2018-08-31")]
+
+SLICE_FLAT = f"""
+    SELECT SUM(units_sold_before), SUM(units_sold_after)
+    FROM tariff_impact
+    WHERE country = ? AND product_type = ? AND ({ISO_DATE}) BETWEEN ? AND ?"""
+
+SLICE_NORMALIZED = """
+    SELECT SUM(f.units_sold_before), SUM(f.units_sold_after)
+    FROM fact_tariff_impact f
+    JOIN dim_country c USING (country_id)
+    JOIN dim_product_type t USING (product_type_id)
+    WHERE c.country = ? AND t.product_type = ? AND f.increase_date BETWEEN ? AND ?"""
+
+
+def time_queries(conn, hypotheses, slice_sql, repeat):
+    """Best time of each hypothesis and of all slices together, and the slice results."""
+    best = {}
+    for _ in range(repeat):
+        for r in run_hypotheses(conn, hypotheses):
+            best[r['name']] = min(best.get(r['name'], float('inf')), r['seconds'])
+        start = time.perf_counter()
+        sliced = [conn.execute(slice_sql, params).fetchone() for params in SLICES]
+        best['slices'] = min(best.get('slices', float('inf')), time.perf_counter() - start)
+    return best, sliced
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[600, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            conn = connect(os.path.join(tmp, f"tariff_{n}.sqlite"))
+            load_csv(conn, write_synthetic_raw(os.path.join(tmp, f"raw_{n}.csv"), n))
+            for name in INDEXES:
+                conn.execute(f"DROP INDEX {name}")
+            before, sliced = time_queries(conn, HYPOTHESES, SLICE_FLAT, args.repeat)
+            create_indexes(conn)
+            indexed, _ = time_queries(conn, HYPOTHESES, SLICE_FLAT, args.repeat)
+            t_migrate = migrate(conn)['seconds']
+            after, sliced_after = time_queries(conn, NORMALIZED_HYPOTHESES, SLICE_NORMALIZED, args.repeat)
+
+            assert sliced == sliced_after
+            for flat, normalized in zip(run_hypotheses(conn), run_hypotheses(conn, NORMALIZED_HYPOTHESES)):
+                for column in flat['result']:
+                    a, b = flat['result'][column], normalized['result'][column]
+                    assert np.allclose(a, b) if a.dtype.kind == 'f' else (a.values == b.values).all(), flat['name']
+            sizes = dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall()) \
+                if conn.execute("SELECT 1 FROM pragma_module_list WHERE name = 'dbstat'").fetchone() else {}
+            conn.close()
+
+            print(f"{n:,} rows: migrated in {t_migrate:.2f}s")
+            if sizes:
+                print(f"  table size: flat {sizes['tariff_impact'] / 2**20:.1f} MB, "
+                      f"normalized {sizes['fact_tariff_impact'] / 2**20:.1f} MB")
+            print(f"  {'query':<46} {'flat ms':>9} {'indexed ms':>11} {'normalized ms':>14}")
+            for name in [*HYPOTHESES, 'slices']:
+                print(f"  {name:<46} {before[name] * 1e3:>9.2f} {indexed[name] * 1e3:>11.2f} {after[name] * 1e3:>14.2f}")
+            total = [sum(t.values()) * 1e3 for t in (before, indexed, after)]
+            print(f"  {'total':<46} {total[0]:>9.2f} {total[1]:>11.2f} {total[2]:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
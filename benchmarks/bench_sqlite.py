@@ -0,0 +1,51 @@
+"""Bulk-load and hypothesis query latency of the SQLite backend, with and without its indexes.
+
+Run from the repository root:
+    python -m benchmarks.bench_sqlite [--sizes 600 100000 1000000] [--repeat 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks._synth import write_synthetic_raw
+from tariff_db import HYPOTHESES, INDEXES, connect, create_indexes, load_csv, run_hypotheses
+
+
+def best_of(conn, repeat):
+    best = {}
+    for _ in range(repeat):
+        for r in run_hypotheses(conn):
+            best[r['name']] = min(best.get(r['name'], float('inf')), r['seconds'])
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[600, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            csv_path = write_synthetic_raw(os.path.join(tmp, f"raw_{n}.csv"), n)
+            conn = connect(os.path.join(tmp, f"tariff_{n}.sqlite"))
+            start = time.perf_counter()
+            load_csv(conn, csv_path)
+            t_load = time.perf_counter() - start
+            indexed = best_of(conn, args.repeat)
+            for name in INDEXES:
+                conn.execute(f"DROP INDEX {name}")
+            plain = best_of(conn, args.repeat)
+            create_indexes(conn)
+            conn.close()
+
+            print(f"{n:,} rows: loaded and indexed in {t_load:.2f}s ({n / t_load:,.0f} rows/s)")
+            print(f"  {'query':<46} {'scan ms':>10} {'indexed ms':>11}")
+            for name in HYPOTHESES:
+                print(f"  {name:<46} {plain[name] * 1e3:>10.2f} {indexed[name] * 1e3:>11.2f}")
+            print(f"  {'total':<46} {sum(plain.values()) * 1e3:>10.2f} {sum(indexed.values()) * 1e3:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Peak RSS of enrich_data() in-memory vs. chunked streaming, plus output parity.
+
+Each run happens in a fresh interpreter and reports its own high-water mark (VmHWM;
+ru_maxrss is inherited from the parent across fork/exec on Linux, so it is only a
+fallback).
+The streamed output is compared byte-for-byte with the in-memory output.
+
+Run from the repository root:
+    python -m benchmarks.bench_streaming [--sizes 100000 1000000 3000000] [--chunksize 100000]
+"""
+import argparse
+import filecmp
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks._synth import BASE_DIR, write_synthetic_raw
+
+CHILD = """
+import resource, sys, time
+from enrich_data import enrich_data
+start = time.perf_counter()
+enrich_data(sys.argv[1], sys.argv[2], chunksize=int(sys.argv[3]) or None)
+elapsed = time.perf_counter() - start
+try:
+    with open('/proc/self/status') as f:
+        peak_kb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+except OSError:
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(peak_kb, elapsed)
+"""
+
+
+def run(input_path, output_path, chunksize):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, input_path, output_path, str(chunksize)],
+        cwd=BASE_DIR, check=True, capture_output=True, text=True,
+    )
+    max_rss_kb, elapsed = out.stdout.strip().splitlines()[-1].split()
+    return int(max_rss_kb) / 1024, float(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 3_000_000])
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'input MB':>9} {'in-memory MB':>13} {'streaming MB':>13} {'in-mem s':>9} {'stream s':>9} {'identical':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            raw = write_synthetic_raw(os.path.join(tmp, f"raw_{n}.csv"), n)
+            full_out = os.path.join(tmp, f"full_{n}.csv")
+            stream_out = os.path.join(tmp, f"stream_{n}.csv")
+
+            rss_full, t_full = run(raw, full_out, 0)
+            rss_stream, t_stream = run(raw, stream_out, args.chunksize)
+            identical = filecmp.cmp(full_out, stream_out, shallow=False)
+
+            print(f"{n:>12,} {os.path.getsize(raw) / 2**20:>9,.0f} {rss_full:>13,.0f} {rss_stream:>13,.0f} "
+                  f"{t_full:>9.1f} {t_stream:>9.1f} {str(identical):>10}")
+            for path in (raw, full_out, stream_out):
+                os.remove(path)
+            if not identical:
+                sys.exit(f"streamed output differs from the in-memory output at {n:,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Rows/sec of the trade list classification, legacy per-row apply vs. the rule registry.
+
+Run from the repository root:
+    python -m benchmarks.bench_trade_list [--sizes 10000 1000000 10000000] [--legacy-max 1000000]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks._synth import synthetic_raw
+from trade_rules import TradeRuleRegistry
+
+
+def map_trade_list(row):
+    # Original row-wise implementation, kept here as the reference for output parity
+    trade_lists = []
+    if row['country'] == 'China':
+        trade_lists.append("Section 301")
+    if row['product_type'] in ['Automobiles', 'Electronics']:
+        trade_lists.append("Potential Section 232/Tech Restrictions")
+    return " | ".join(trade_lists) if trade_lists else "Standard"
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--legacy-max', type=int, default=1_000_000,
+                        help="skip the per-row apply above this many rows (it takes minutes at 10M)")
+    args = parser.parse_args()
+
+    registry = TradeRuleRegistry.from_file()
+    print(f"{'rows':>12} {'legacy rows/s':>15} {'registry rows/s':>17} {'speedup':>9}")
+    for n in args.sizes:
+        df = synthetic_raw(n, columns=['country', 'product_type', 'product_name', 'date'])
+        fast, t_fast = timed(lambda: registry.classify(df))
+
+        legacy_rate = speedup = "-"
+        if n <= args.legacy_max:
+            slow, t_slow = timed(lambda: df.apply(map_trade_list, axis=1))
+            pd.testing.assert_series_equal(fast, slow, check_names=False)
+            legacy_rate = f"{n / t_slow:,.0f}"
+            speedup = f"{t_slow / t_fast:,.0f}x"
+
+        print(f"{n:>12,} {legacy_rate:>15} {n / t_fast:>17,.0f} {speedup:>9}")
+
+
+if __name__ == "__main__":
+    main()
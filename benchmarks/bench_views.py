@@ -0,0 +1,50 @@
+"""Hypothesis latency from the table vs. the summary tables, and incremental vs. full refresh.
+
+Run from the repository root:
+    python -m benchmarks.bench_views [--sizes 600 100000 1000000] [--append 10000] [--repeat 3]
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from benchmarks._synth import write_synthetic_raw
+from hypothesis_views import hypothesis_results, refresh_views
+from tariff_db import connect, load_csv, run_hypotheses
+
+
+def best_total(fn, repeat):
+    return min(sum(r['seconds'] for r in fn()) for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[600, 100_000, 1_000_000])
+    parser.add_argument('--append', type=int, default=10_000, help="rows appended before the incremental refresh")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'table ms':>9} {'views ms':>9} {'rebuild s':>10} {'refresh ms':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        appended = write_synthetic_raw(os.path.join(tmp, "append.csv"), args.append, seed=1)
+        for n in args.sizes:
+            conn = connect(os.path.join(tmp, f"tariff_{n}.sqlite"))
+            load_csv(conn, write_synthetic_raw(os.path.join(tmp, f"raw_{n}.csv"), n))
+            t_rebuild = refresh_views(conn, rebuild=True)['seconds']
+            load_csv(conn, appended, append=True)
+            t_refresh = refresh_views(conn)['seconds']
+
+            for table, views in zip(run_hypotheses(conn), hypothesis_results(conn, refresh=False)):
+                for column in table['result']:
+                    a, b = table['result'][column], views['result'][column]
+                    assert np.allclose(a, b) if a.dtype.kind == 'f' else (a.values == b.values).all(), table['name']
+
+            t_table = best_total(lambda: run_hypotheses(conn), args.repeat)
+            t_views = best_total(lambda: hypothesis_results(conn), args.repeat)
+            conn.close()
+            print(f"{n:>12,} {t_table * 1e3:>9.2f} {t_views * 1e3:>9.2f} {t_rebuild:>10.2f} {t_refresh * 1e3:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
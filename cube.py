@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from geo import region_of
+from groupby_log import record_groupby
+
+# Grain of the cube. Region follows from country, and each country only has a handful
+# of coordinates, so the cube grows with the calendar rather than with the row count.
+CUBE_DIMENSIONS = ['country', 'Region', 'product_type', 'Trade_List_Status', 'date', 'latitude', 'longitude']
+# Additive measures only, so cubes built from separate chunks can be summed together
+CUBE_MEASURES = [
+    'Revenue_Loss', 'Revenue_Loss_Abs', 'Revenue_Loss_Pct', 'Revenue_Before', 'Revenue_After',
+    'units_sold_before', 'units_sold_after', 'Elasticity_Sum', 'Elasticity_Count', 'Rows',
+]
+
+# Enriched columns the cube is built from
+CUBE_SOURCE_COLUMNS = [c for c in CUBE_DIMENSIONS if c != 'Region'] + [
+    'Revenue_Loss', 'Revenue_Before', 'Revenue_After', 'units_sold_before', 'units_sold_after',
+    'Price_Elasticity_of_Demand',
+]
+
+
+def revenue_loss_pct(df):
+    """Row-level loss as a share of pre-tariff revenue (0 where there was no revenue)."""
+    before = df['Revenue_Before'].astype('float64')
+    return (df['Revenue_Loss'].abs().astype('float64') / before.replace(0, np.nan) * 100).fillna(0)
+
+
+def _measures(df):
+    loss_abs = df['Revenue_Loss'].abs().astype('float64')
+    before = df['Revenue_Before'].astype('float64')
+    elasticity = df['Price_Elasticity_of_Demand'].astype('float64')
+    return pd.DataFrame({
+        'Revenue_Loss': df['Revenue_Loss'].astype('float64'),
+        'Revenue_Loss_Abs': loss_abs,
+        # What the "Percent Impact" view sums
+        'Revenue_Loss_Pct': revenue_loss_pct(df),
+        'Revenue_Before': before,
+        'Revenue_After': df['Revenue_After'].astype('float64'),
+        'units_sold_before': df['units_sold_before'].astype('float64'),
+        'units_sold_after': df['units_sold_after'].astype('float64'),
+        'Elasticity_Sum': elasticity,
+        'Elasticity_Count': elasticity.notna().astype('int64'),
+        'Rows': np.ones(len(df), dtype='int64'),
+    }, index=df.index)
+
+
+def _keys(df):
+    keys = df[[c for c in CUBE_DIMENSIONS if c != 'Region']].copy()
+    for col in ['country', 'product_type', 'Trade_List_Status']:
+        keys[col] = keys[col].astype(object)
+    keys['date'] = pd.to_datetime(keys['date'], dayfirst=True, errors='coerce')
+    keys.insert(1, 'Region', region_of(df['country']).to_numpy())
+    return keys
+
+
+def combine_cubes(cubes):
+    """Merge cubes built over disjoint sets of rows into one."""
+    cube = pd.concat(cubes, ignore_index=True)
+    record_groupby(CUBE_DIMENSIONS, len(cube))
+    return cube.groupby(CUBE_DIMENSIONS, dropna=False, sort=True)[CUBE_MEASURES].sum().reset_index()
+
+
+def build_cube(df):
+    """Roll an enriched frame up to one row per CUBE_DIMENSIONS combination.
+
+    Rows with missing keys keep their own cells (NaN/NaT), so consumers can apply
+    the same row hygiene they would have applied to the raw frame.
+    """
+    return combine_cubes([pd.concat([_keys(df), _measures(df)], axis=1)])
+
+
+def slice_cube(cube, country="All", sector="All"):
+    """Cube cells matching the dashboard filters ("All" leaves a dimension unfiltered)."""
+    mask = np.ones(len(cube), dtype=bool)
+    if country != "All":
+        mask &= (cube['country'] == country).to_numpy()
+    if sector != "All":
+        mask &= (cube['product_type'] == sector).to_numpy()
+    return cube[mask]
+
+
+def rollup(cube, by, measures=None, dropna=True):
+    """Sum `measures` (default: all) of a cube or cube slice over the `by` dimensions.
+
+    Cells with a missing `by` key are dropped unless `dropna` is False.
+    """
+    measures = measures or CUBE_MEASURES
+    record_groupby(by, len(cube))
+    return cube.groupby(by, observed=True, sort=True, dropna=dropna)[measures].sum().reset_index()
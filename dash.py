@@ -2,9 +2,13 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from streamlit_elements import elements, dashboard, mui
-import base64
 import os
 
+from assets import THUMBNAIL_WIDTH, asset_data_uri
+from data_store import ENRICHED_CSV, compact_frame, dataset_paths, parquet_path_for, read_enriched
+from downsample import downsample_scatter, render_mode
+from hot_reload import HotReloader
+
 st.set_page_config(page_title="Tariff Impact Dashboard", layout="wide")
 
 # ==============================
@@ -40,14 +44,17 @@ st.markdown(f"""
 # ==============================
 # Data Loading
 # ==============================
-@st.cache_data
 def load_data():
-    file_path = "Tariff_Impact_Analysis_Enriched.csv"
-    if os.path.exists(file_path):
-        return pd.read_csv(file_path)
+    if os.path.exists(ENRICHED_CSV) or os.path.exists(parquet_path_for(ENRICHED_CSV)):
+        return compact_frame(read_enriched())
     return pd.DataFrame()
 
-df = load_data()
+@st.cache_resource
+def get_dataset():
+    # Shared, read-only rows; new ETL output is loaded in the background while these keep serving
+    return HotReloader(load_data, dataset_paths(ENRICHED_CSV))
+
+df = get_dataset().current()
 
 # ==============================
 # Sidebar - Filters
@@ -105,7 +112,7 @@ if not filtered_df.empty:
 
     with col_chart1:
         st.markdown("#### Total Revenue Loss by Country")
-        country_loss = filtered_df.groupby('country')['Revenue_Loss'].sum().reset_index()
+        country_loss = filtered_df.groupby('country', observed=True)['Revenue_Loss'].sum().reset_index()
         fig1 = px.bar(country_loss, x='country', y='Revenue_Loss', 
                       color='Revenue_Loss',
                       color_continuous_scale=[COLOR_SECONDARY, COLOR_GRADIENT, COLOR_ALERT],
@@ -121,14 +128,21 @@ if not filtered_df.empty:
         st.plotly_chart(fig2, use_container_width=True)
         
     st.markdown("#### Volume vs Price Shift Correlation")
-    fig3 = px.scatter(filtered_df, x='Price_Delta_Pct', y='Volume_Delta_Pct', 
+    # Large selections are thinned per product type; outliers and the biggest bubbles are always kept
+    positions = downsample_scatter(filtered_df, 'Price_Delta_Pct', 'Volume_Delta_Pct',
+                                   by='product_type' if 'product_type' in filtered_df else None, size='price_before_USD')
+    scatter_df = filtered_df if positions is None else filtered_df.take(positions)
+    fig3 = px.scatter(scatter_df, x='Price_Delta_Pct', y='Volume_Delta_Pct', 
                       color='Trade_List_Status' if 'Trade_List_Status' in filtered_df else None, 
                       size='price_before_USD',
                       hover_data=['product_name', 'country'],
                       color_discrete_sequence=[COLOR_ALERT, COLOR_SECONDARY, "#f77f00"],
-                      template="plotly_dark")
+                      template="plotly_dark",
+                      render_mode=render_mode(len(scatter_df)))
     fig3.update_layout(plot_bgcolor=COLOR_PRIMARY, paper_bgcolor=COLOR_PRIMARY, font_color=COLOR_TEXT)
     st.plotly_chart(fig3, use_container_width=True)
+    if positions is not None:
+        st.caption(f"Showing {len(scatter_df):,} of {len(filtered_df):,} transactions.")
 
 else:
     st.warning("⚠️ **Enriched Dataset not found or empty.** Please ensure the ETL script successfully completed and `Tariff_Impact_Analysis_Enriched.csv` is present in the directory.")
@@ -140,65 +154,59 @@ st.markdown("### 📦 Historical Static Snapshots (Legacy)")
 # ==============================
 # Legacy Dashboard (Static PNGs)
 # ==============================
+# Card key, title and source image; the grid shows thumbnails and one card at a time opens at full size
+LEGACY_CARDS = [
+    ("card1", "Product Price Comparison", "Source/Product Price Comparation.png"),
+    ("card2", "Average Price Change Type", "Source/Averange Price Before and After Tariff.png"),
+    ("card3", "Price Before and After", "Source/Distribution of Product Prices Before vs After Tariff.png"),
+    ("card4", "Heatmap: Units Sold", "Source/Heatmap of Units Sold by Product Type and Period.png"),
+    ("card5", "Price Change by Country", "Source/Percentage Change in Average Product Price by Country.png"),
+    ("card6", "Price Before vs After Tariff", "Source/Price Before and After Tariff.png"),
+    ("card7", "Units Sold (Before vs After)", "Source/Units Sold Before vs After Tariff.png"),
+    ("card8", "Units Sold by Product Type", "Source/Units Sold by Product Type (Before & After Tariff.png"),
+    ("card9", "Imports Before vs After", "Source/Averange Price Before and After Tariff.png"),
+]
+
+@st.dialog("Legacy Snapshot", width="large")
+def show_legacy_card(title, path):
+    # The original PNG, served by URL from Streamlit's media endpoint only once a card is expanded
+    st.markdown(f"#### {title}")
+    if os.path.exists(path):
+        st.image(path, width="stretch")
+
+def expand_legacy_card(key):
+    return lambda: st.session_state.update(legacy_card=key)
+
 with st.expander("View Legacy Static Maps & Charts", expanded=False):
-    def image_base64(path):
-        if not os.path.exists(path):
-            return "data:image/png;base64,"
-        with open(path, "rb") as img_file:
-            encoded = base64.b64encode(img_file.read()).decode()
-            ext = path.split('.')[-1].lower()
-            return f"data:image/{ext};base64,{encoded}"
-
-    layout = [
-        dashboard.Item("card1", 0, 0, 4, 3),
-        dashboard.Item("card2", 4, 0, 4, 3),
-        dashboard.Item("card3", 8, 0, 4, 3),
-        dashboard.Item("card4", 0, 3, 4, 4),
-        dashboard.Item("card5", 4, 3, 4, 3),
-        dashboard.Item("card6", 8, 3, 4, 3),
-        dashboard.Item("card7", 0, 7, 4, 3),
-        dashboard.Item("card8", 4, 7, 4, 3),
-        dashboard.Item("card9", 8, 7, 4, 3),
-    ]
-
-    with elements("dashboard"):
-        with dashboard.Grid(layout, draggable=True, resizable=True):
-
-            with mui.Card(key="card1", sx={"p": 2, "bgcolor": COLOR_PRIMARY, "color": COLOR_TEXT}):
-                mui.Typography("Product Price Comparison", variant="h6")
-                mui.Box(component="img", src=image_base64("Source/Product Price Comparation.png"), sx={"width": "100%"})
-
-            with mui.Card(key="card2", sx={"p": 2, "bgcolor": COLOR_PRIMARY, "color": COLOR_TEXT}):
-                mui.Typography("Average Price Change Type", variant="h6")
-                mui.Box(component="img", src=image_base64("Source/Averange Price Before and After Tariff.png"), sx={"width": "100%"})
-
-            with mui.Card(key="card3", sx={"p": 2, "bgcolor": COLOR_PRIMARY, "color": COLOR_TEXT}):
-                mui.Typography("Price Before and After", variant="h6")
-                mui.Box(component="img", src=image_base64("Source/Distribution of Product Prices Before vs After Tariff.png"), sx={"width": "100%"})
-
-            with mui.Card(key="card4", sx={"p": 2, "bgcolor": COLOR_PRIMARY, "color": COLOR_TEXT}):
-                mui.Typography("Heatmap: Units Sold", variant="h6")
-                mui.Box(component="img", src=image_base64("Source/Heatmap of Units Sold by Product Type and Period.png"), sx={"width": "100%"})
-
-            with mui.Card(key="card5", sx={"p": 2, "bgcolor": COLOR_PRIMARY, "color": COLOR_TEXT}):
-                mui.Typography("Price Change by Country", variant="h6")
-                mui.Box(component="img", src=image_base64("Source/Percentage Change in Average Product Price by Country.png"), sx={"width": "100%"})
-
-            with mui.Card(key="card6", sx={"p": 2, "bgcolor": COLOR_PRIMARY, "color": COLOR_TEXT}):
-                mui.Typography("Price Before vs After Tariff", variant="h6")
-                mui.Box(component="img", src=image_base64("Source/Price Before and After Tariff.png"), sx={"width": "100%"})
-            
-            with mui.Card(key="card7", sx={"p": 2, "bgcolor": COLOR_PRIMARY, "color": COLOR_TEXT}):
-                mui.Typography("Units Sold (Before vs After)", variant="h6")
-                mui.Box(component="img", src=image_base64("Source/Units Sold Before vs After Tariff.png"), sx={"width": "100%"})
-
-            with mui.Card(key="card8", sx={"p": 2, "bgcolor": COLOR_PRIMARY, "color": COLOR_TEXT}):
-                mui.Typography("Units Sold by Product Type", variant="h6")
-                mui.Box(component="img", src=image_base64("Source/Units Sold by Product Type (Before & After Tariff.png"), sx={"width": "100%"})
-            
-            with mui.Card(key="card9", sx={"p": 2, "bgcolor": COLOR_PRIMARY, "color": COLOR_TEXT}):
-                mui.Typography("Imports Before vs After", variant="h6")
-                mui.Box(component="img", src=image_base64("Source/Averange Price Before and After Tariff.png"), sx={"width": "100%"})
+    # An expander's body runs even while collapsed, so the thumbnails are only encoded and
+    # sent once the gallery is switched on (the toggle's state lives in st.session_state)
+    show_gallery = st.toggle("Load snapshot gallery", key="show_legacy_gallery")
+
+    if show_gallery:
+        layout = [
+            dashboard.Item("card1", 0, 0, 4, 3),
+            dashboard.Item("card2", 4, 0, 4, 3),
+            dashboard.Item("card3", 8, 0, 4, 3),
+            dashboard.Item("card4", 0, 3, 4, 4),
+            dashboard.Item("card5", 4, 3, 4, 3),
+            dashboard.Item("card6", 8, 3, 4, 3),
+            dashboard.Item("card7", 0, 7, 4, 3),
+            dashboard.Item("card8", 4, 7, 4, 3),
+            dashboard.Item("card9", 8, 7, 4, 3),
+        ]
+
+        with elements("dashboard"):
+            with dashboard.Grid(layout, draggable=True, resizable=True):
+                for key, title, path in LEGACY_CARDS:
+                    with mui.Card(key=key, sx={"p": 2, "bgcolor": COLOR_PRIMARY, "color": COLOR_TEXT}):
+                        mui.Typography(title, variant="h6")
+                        mui.Box(component="img", src=asset_data_uri(path, max_width=THUMBNAIL_WIDTH), sx={"width": "100%"})
+                        mui.Button("Expand", size="small", onClick=expand_legacy_card(key), sx={"color": COLOR_TEXT})
+
+# Set by a card's Expand button; cleared so closing the dialog does not reopen it on the next rerun
+selected_card = st.session_state.pop("legacy_card", None)
+if selected_card is not None:
+    show_legacy_card(*next((title, path) for key, title, path in LEGACY_CARDS if key == selected_card))
 
 st.markdown("---")
 st.markdown("📍 Developed by DeCledenir")
@@ -3,6 +3,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from cube import build_cube, rollup
+from data_store import dataset_paths, read_cube, read_enriched
+from hot_reload import HotReloader
+
 # ==========================================
 # 1. PAGE CONFIGURATION & THEME
 # ==========================================
@@ -178,29 +182,26 @@ st.markdown(f"""
 # ==========================================
 # 2. DATA ENGINEERING & CLEANING
 # ==========================================
-@st.cache_data
-def load_data():
-    try:
-        df = pd.read_csv("Tariff_Impact_Analysis_Enriched.csv")
-        df = df.fillna(0)
-        
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'], errors='coerce')
-        elif 'Date' in df.columns: 
-            df['date'] = pd.to_datetime(df['Date'], errors='coerce')
-
-        if 'date' in df.columns:
-            df = df.dropna(subset=['date'])
-
-        if 'latitude' in df.columns and 'longitude' in df.columns:
-            df = df.dropna(subset=['latitude', 'longitude'])
+def load_cube():
+    # Every panel is a rollup, so the page reads the ETL's aggregate cube instead of the rows
+    cube = read_cube()
+    if cube is None:
+        cube = build_cube(read_enriched())
+    # Same hygiene the row-level loader applied: undated rows are dropped and
+    # missing coordinates are zero-filled
+    cube = cube.dropna(subset=['date'])
+    cube[['latitude', 'longitude']] = cube[['latitude', 'longitude']].fillna(0)
+    return cube
 
-        df['Revenue_Loss_Abs'] = df['Revenue_Loss'].abs()
-        return df
-    except Exception as e:
-        return pd.DataFrame()
+@st.cache_resource
+def get_dataset():
+    # Shared, read-only cube; new ETL output is loaded in the background while this one keeps serving
+    return HotReloader(load_cube, dataset_paths())
 
-df = load_data()
+try:
+    cube = get_dataset().current()
+except Exception as e:
+    cube = pd.DataFrame()
 
 
 # ==========================================
@@ -208,14 +209,14 @@ df = load_data()
 # ==========================================
 st.markdown("<div class='dashboard-title'>DATA VISUALIZATION</div>", unsafe_allow_html=True)
 
-if not df.empty:
+if not cube.empty:
     
     # ----------------------------------------------------
     # LAYER 0: THE 3D GLOBE (Center, Z-Index 1)
     # ----------------------------------------------------
     st.markdown("<div class='abs-center-globe'>", unsafe_allow_html=True)
     
-    geo_df = df.groupby(['country', 'latitude', 'longitude'])['Revenue_Loss_Abs'].sum().reset_index()
+    geo_df = rollup(cube, ['country', 'latitude', 'longitude'], ['Revenue_Loss_Abs'])
     cap_val = geo_df['Revenue_Loss_Abs'].quantile(0.95)
     geo_df['Revenue_Loss_Capped'] = geo_df['Revenue_Loss_Abs'].clip(upper=cap_val)
     
@@ -254,9 +255,10 @@ if not df.empty:
     
     # KPI Cards (Vertical Glassmorphism)
     st.markdown("<div class='section-title'>Financial Damage</div>", unsafe_allow_html=True)
-    calc_rev_loss = df['Revenue_Loss'].sum()
-    calc_vol_pct = ((df['units_sold_after'].sum() - df['units_sold_before'].sum()) / df['units_sold_before'].sum() * 100) if df['units_sold_before'].sum() > 0 else 0
-    calc_elasticity = df['Price_Elasticity_of_Demand'].mean()
+    calc_rev_loss = cube['Revenue_Loss'].sum()
+    calc_vol_pct = ((cube['units_sold_after'].sum() - cube['units_sold_before'].sum()) / cube['units_sold_before'].sum() * 100) if cube['units_sold_before'].sum() > 0 else 0
+    # Missing elasticities count as 0, as they did when the rows were zero-filled
+    calc_elasticity = cube['Elasticity_Sum'].sum() / cube['Rows'].sum()
 
     st.markdown(f"""
     <div class='glass-kpi'>
@@ -277,7 +279,9 @@ if not df.empty:
 
     # Elasticity Radar
     st.markdown("<div class='section-title' style='margin-top:10px;'>Price Sensitivity Radar</div>", unsafe_allow_html=True)
-    radar_df = df.groupby('country')['Price_Elasticity_of_Demand'].mean().reset_index().sort_values('Price_Elasticity_of_Demand').head(5)
+    radar_df = rollup(cube, ['country'], ['Elasticity_Sum', 'Rows'])
+    radar_df['Price_Elasticity_of_Demand'] = radar_df['Elasticity_Sum'] / radar_df['Rows']
+    radar_df = radar_df.sort_values('Price_Elasticity_of_Demand').head(5)
     fig_radar = px.line_polar(radar_df, r='Price_Elasticity_of_Demand', theta='country', line_close=True, template="plotly_dark")
     fig_radar.update_traces(fill='toself', line_color=ACCENT_COLOR, fillcolor='rgba(0, 212, 255, 0.3)')
     fig_radar.update_layout(
@@ -288,8 +292,8 @@ if not df.empty:
 
     # Revenue Chronology
     st.markdown("<div class='section-title'>Revenue Chronology</div>", unsafe_allow_html=True)
-    if 'date' in df.columns:
-        df_time = df.groupby('date')[['Revenue_Before', 'Revenue_After']].sum().reset_index()
+    if 'date' in cube.columns:
+        df_time = rollup(cube, ['date'], ['Revenue_Before', 'Revenue_After'])
         fig_line = go.Figure()
         fig_line.add_trace(go.Scatter(
             x=df_time['date'], y=df_time['Revenue_After'],
@@ -316,7 +320,7 @@ if not df.empty:
     st.markdown("<div class='abs-right'>", unsafe_allow_html=True)
     
     st.markdown("<div class='section-title'>Trade Status Impact</div>", unsafe_allow_html=True)
-    trade_dist = df.groupby('Trade_List_Status')['Revenue_Loss_Abs'].sum().reset_index()
+    trade_dist = rollup(cube, ['Trade_List_Status'], ['Revenue_Loss_Abs'])
     
     fig_d1 = px.pie(trade_dist, names='Trade_List_Status', values='Revenue_Loss_Abs', hole=0.75,
                     color_discrete_sequence=["#ff0055", "#aa00ff", "#00d4ff"], template="plotly_dark")
@@ -330,7 +334,7 @@ if not df.empty:
     st.plotly_chart(fig_d1, use_container_width=True)
     
     st.markdown("<div class='section-title'>Sector Breakdown</div>", unsafe_allow_html=True)
-    pd_dist = df.groupby('product_type')['Revenue_Loss_Abs'].sum().reset_index()
+    pd_dist = rollup(cube, ['product_type'], ['Revenue_Loss_Abs'])
     fig_d2 = px.pie(pd_dist, names='product_type', values='Revenue_Loss_Abs', hole=0.75,
                     color_discrete_sequence=["#1982c4", "#8ac926", "#ff595e", "#ffca3a"], template="plotly_dark")
     fig_d2.update_traces(textposition='inside', textinfo='percent', textfont_size=10, marker=dict(line=dict(width=0)))
@@ -338,7 +342,7 @@ if not df.empty:
     st.plotly_chart(fig_d2, use_container_width=True)
 
     st.markdown("<div class='section-title'>Top 5 Risk Markets</div>", unsafe_allow_html=True)
-    top5 = df.groupby('country')['Revenue_Loss_Abs'].sum().reset_index().sort_values('Revenue_Loss_Abs', ascending=True).tail(5)
+    top5 = rollup(cube, ['country'], ['Revenue_Loss_Abs']).sort_values('Revenue_Loss_Abs', ascending=True).tail(5)
     
     fig_hbar = px.bar(top5, x='Revenue_Loss_Abs', y='country', orientation='h', 
                       color='Revenue_Loss_Abs', color_continuous_scale=['#470000', '#ff0000'],
@@ -363,8 +367,8 @@ if not df.empty:
     st.markdown("<div class='bottom-hook'></div>", unsafe_allow_html=True)
     
     c1, c2, c3 = st.columns([1,1,2])
-    total_countries = df['country'].nunique()
-    total_industries = df['product_type'].nunique()
+    total_countries = cube['country'].nunique()
+    total_industries = cube['product_type'].nunique()
     
     # Render minimalist metrics
     c1.markdown(f"<div style='text-align:center;'><div style='font-size:1.8rem; font-weight:800; color:{TEXT_COLOR};'>{total_countries}</div><div style='font-size:0.75rem; color:#8d99ae; text-transform:uppercase;'>Affected Countries</div></div>", unsafe_allow_html=True)
@@ -0,0 +1,201 @@
+import glob
+import hashlib
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+ENRICHED_CSV = "Tariff_Impact_Analysis_Enriched.csv"
+
+# Explicit Arrow types for the enriched dataset; columns not listed keep their inferred type
+DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+ENRICHED_ARROW_TYPES = {
+    'country': DICTIONARY,
+    'product_name': pa.string(),
+    'product_type': DICTIONARY,
+    'price_before_USD': pa.float32(),
+    'price_after_USD': pa.float32(),
+    'tariff_pct': pa.float32(),
+    'date': pa.timestamp('ns'),
+    'units_sold_before': pa.int32(),
+    'units_sold_after': pa.int32(),
+    'latitude': pa.float64(),
+    'longitude': pa.float64(),
+    'Price_Delta_Pct': pa.float32(),
+    'Volume_Delta_Pct': pa.float32(),
+    'Price_Elasticity_of_Demand': pa.float32(),
+    'Revenue_Before': pa.float32(),
+    'Revenue_After': pa.float32(),
+    'Revenue_Loss': pa.float32(),
+    'Volume_Driven_Revenue_Loss': pa.float32(),
+    'GDP_Trillions': pa.float32(),
+    'CPI_Pct': pa.float32(),
+    'Trade_List_Status': DICTIONARY,
+    'Year': pa.int16(),
+}
+
+# Text columns dictionary-encoded (pandas Categorical) by compact_frame()
+CATEGORICAL_COLUMNS = ['country', 'product_name', 'product_type', 'Trade_List_Status']
+
+
+def parquet_path_for(csv_path):
+    """The typed Parquet copy written alongside an enriched CSV."""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def parquet_parts(parquet_path):
+    """`parquet_path` and the parts appended after it by incremental runs, in row order."""
+    stem = os.path.splitext(parquet_path)[0]
+    return [parquet_path] + sorted(glob.glob(glob.escape(stem) + ".part-*.parquet"))
+
+
+def next_part_path(parquet_path):
+    """Where the next part appended to `parquet_path` goes."""
+    return f"{os.path.splitext(parquet_path)[0]}.part-{len(parquet_parts(parquet_path)):06d}.parquet"
+
+
+def remove_parts(parquet_path):
+    """Delete the appended parts of `parquet_path`, e.g. before it is rewritten whole."""
+    for part in parquet_parts(parquet_path)[1:]:
+        os.remove(part)
+
+
+def csv_source(csv_path, start=0):
+    """Parquet metadata naming the enriched CSV bytes from `start` to the end that a Parquet file was written from."""
+    size = os.path.getsize(csv_path)
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {'csv_bytes': f"{start}:{size}", 'csv_sha256': digest.hexdigest()}
+
+
+def tag_source(table, csv_path, start=0):
+    """`table` with the csv_source() of its CSV bytes added to its schema metadata."""
+    source = {key.encode(): value.encode() for key, value in csv_source(csv_path, start).items()}
+    return table.replace_schema_metadata({**(table.schema.metadata or {}), **source})
+
+
+def parquet_matches_csv(csv_path):
+    """Whether the Parquet copy and its parts were written from the enriched CSV exactly as it is now.
+
+    Each Parquet file records the CSV byte range it holds and that range's digest, so
+    the answer follows the files' contents rather than their timestamps.
+    """
+    parts = parquet_parts(parquet_path_for(csv_path))
+    if not os.path.exists(parts[0]):
+        return False
+    end = 0
+    with open(csv_path, 'rb') as f:
+        for part in parts:
+            metadata = pq.read_metadata(part).metadata or {}
+            if b'csv_bytes' not in metadata:
+                return False
+            start, stop = map(int, metadata[b'csv_bytes'].split(b':'))
+            if start != end:
+                return False
+            digest = hashlib.sha256(f.read(stop - start))
+            if f.tell() != stop or digest.hexdigest().encode() != metadata.get(b'csv_sha256'):
+                return False
+            end = stop
+        return not f.read(1)
+
+
+def manifest_path_for(csv_path):
+    """Row-hash manifest used by incremental enrichment runs."""
+    return os.path.splitext(csv_path)[0] + ".manifest.parquet"
+
+
+def cube_path_for(csv_path):
+    """Aggregate cube (see cube.py) materialized next to an enriched CSV."""
+    return os.path.splitext(csv_path)[0] + ".cube.parquet"
+
+
+def dataset_paths(csv_path=ENRICHED_CSV):
+    """Every file the dashboards read for one enriched dataset (CSV, Parquet copy, cube)."""
+    return [csv_path, parquet_path_for(csv_path), cube_path_for(csv_path)]
+
+
+def to_arrow_table(df, schema=None):
+    """Convert an enriched frame to Arrow, cast to `schema` or to ENRICHED_ARROW_TYPES."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if schema is None:
+        schema = pa.schema([
+            pa.field(field.name, ENRICHED_ARROW_TYPES.get(field.name, field.type))
+            for field in table.schema
+        ])
+    return table.cast(schema)
+
+
+def memory_mb(df):
+    """Deep in-memory size of a frame, in MiB."""
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def compact_frame(df, verbose=True):
+    """Dictionary-encode CATEGORICAL_COLUMNS and downcast numerics, returning a new frame.
+
+    Numeric columns take their ENRICHED_ARROW_TYPES type (integers only when they have
+    no missing values); other float64 columns, e.g. ones derived after loading, become
+    float32. The frame's attrs are kept, plus `memory_mb` as (before, after).
+    """
+    before = memory_mb(df)
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        arrow_type = ENRICHED_ARROW_TYPES.get(col)
+        if col in CATEGORICAL_COLUMNS:
+            values = values.astype('category')
+        elif arrow_type is not None and pa.types.is_floating(arrow_type):
+            values = values.astype(arrow_type.to_pandas_dtype())
+        elif arrow_type is not None and pa.types.is_integer(arrow_type):
+            if pd.api.types.is_numeric_dtype(values) and not values.isna().any():
+                values = values.astype(arrow_type.to_pandas_dtype())
+        elif values.dtype == 'float64':
+            values = values.astype('float32')
+        columns[col] = values
+    out = pd.DataFrame(columns, index=df.index)
+    out.attrs.update(df.attrs)
+    after = memory_mb(out)
+    out.attrs['memory_mb'] = (before, after)
+    if verbose:
+        print(f"Compacted {len(out):,} rows: {before:,.2f} MB -> {after:,.2f} MB "
+              f"({1 - after / before if before else 0:.0%} saved)")
+    return out
+
+
+def read_enriched(csv_path=ENRICHED_CSV):
+    """Load the enriched dataset from its Parquet copy (and parts) if written from the CSV as it is now, else the CSV.
+
+    The frame's `data_version` attr identifies the file it came from (path and mtime),
+    so caches built on top of it can tell when the data has been regenerated.
+    """
+    parts = parquet_parts(parquet_path_for(csv_path))
+    if os.path.exists(parts[0]) and (not os.path.exists(csv_path) or parquet_matches_csv(csv_path)):
+        mtime = max(os.path.getmtime(p) for p in parts)
+        if len(parts) == 1:
+            df = pd.read_parquet(parts[0])
+        else:
+            # Parts are written with the base file's schema, so they concatenate as they are
+            df = pa.concat_tables([pq.read_table(p) for p in parts]).to_pandas()
+        path = parts[0]
+    else:
+        path, df = csv_path, pd.read_csv(csv_path)
+        mtime = os.path.getmtime(path)
+    df.attrs['data_version'] = (os.path.abspath(path), mtime)
+    return df
+
+
+def read_cube(csv_path=ENRICHED_CSV):
+    """Load the materialized cube, or None if it is missing or older than the enriched data."""
+    cube_path = cube_path_for(csv_path)
+    if not os.path.exists(cube_path):
+        return None
+    sources = [p for p in [csv_path, *parquet_parts(parquet_path_for(csv_path))] if os.path.exists(p)]
+    if any(os.path.getmtime(p) > os.path.getmtime(cube_path) for p in sources):
+        return None
+    cube = pd.read_parquet(cube_path)
+    cube.attrs['data_version'] = (os.path.abspath(cube_path), os.path.getmtime(cube_path))
+    return cube
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from groupby_log import record_groupby
+
+# Points a scatter ships to the browser before it is downsampled
+MAX_SCATTER_POINTS = 5000
+# Above this many points scatters render with WebGL instead of SVG (Plotly's own cut-off)
+WEBGL_THRESHOLD = 1000
+
+
+def render_mode(n_points):
+    """'webgl' for scatters too large to draw as SVG, else 'svg'."""
+    return 'webgl' if n_points > WEBGL_THRESHOLD else 'svg'
+
+
+def _robust_z(values):
+    values = np.asarray(values, dtype=float)
+    q1, median, q3 = np.nanpercentile(values, [25, 50, 75]) if np.isfinite(values).any() else (0, 0, 0)
+    scale = (q3 - q1) or 1.0
+    return np.nan_to_num(np.abs(values - median) / scale)
+
+
+def _grid_cells(x, y, bins):
+    codes = []
+    for v in (x, y):
+        v = np.asarray(v, dtype=float)
+        finite = np.isfinite(v)
+        lo, hi = (v[finite].min(), v[finite].max()) if finite.any() else (0.0, 0.0)
+        cell = np.floor((v - lo) / ((hi - lo) or 1.0) * bins)
+        codes.append(np.where(finite, np.clip(cell, 0, bins - 1), bins).astype(np.int64))
+    return codes[0] * (bins + 1) + codes[1]
+
+
+def _water_fill(counts, budget):
+    """Largest per-stratum cap such that sum(min(counts, cap)) <= budget."""
+    counts = np.sort(counts)
+    # Points kept when the cap equals each stratum's own count, smallest first
+    kept = np.cumsum(counts) + counts * (len(counts) - 1 - np.arange(len(counts)))
+    i = np.searchsorted(kept, budget, side='right')
+    if i == len(counts):
+        return counts[-1]
+    below = counts[:i].sum()
+    return max((budget - below) // (len(counts) - i), 0)
+
+
+def downsample_scatter(df, x, y, by=None, size=None, max_points=MAX_SCATTER_POINTS, bins=64, outliers=0.1, seed=0):
+    """Sorted row positions of `df` to plot in an x/y scatter, or None to plot every row.
+
+    A share `outliers` of the budget keeps the rows furthest from the bulk (largest
+    robust z-score of x, y or `size`), so extreme and largest bubbles always show. The
+    rest is spread over strata of `by` (e.g. product_type) crossed with a bins x bins
+    grid over x/y: every stratum keeps up to the same number of random rows, so sparse
+    regions and small groups are kept whole while dense clusters are thinned. The
+    sample is deterministic for a given `seed`.
+    """
+    n = len(df)
+    if n <= max_points:
+        return None
+
+    scores = np.maximum(_robust_z(df[x]), _robust_z(df[y]))
+    if size is not None:
+        scores = np.maximum(scores, _robust_z(df[size]))
+    n_outliers = min(int(max_points * outliers), n)
+    keep = np.zeros(n, dtype=bool)
+    if n_outliers:
+        keep[np.argpartition(-scores, n_outliers - 1)[:n_outliers]] = True
+
+    strata = _grid_cells(df[x], df[y], bins)
+    if by is not None:
+        groups = pd.factorize(df[by], use_na_sentinel=False)[0]
+        strata = groups * ((bins + 1) ** 2) + strata
+    rest = np.flatnonzero(~keep)
+    record_groupby([x, y] if by is None else [by, x, y], len(rest))
+    codes, inverse, counts = np.unique(strata[rest], return_inverse=True, return_counts=True)
+    cap = _water_fill(counts, max_points - n_outliers)
+
+    # Rank rows within their stratum in random order and keep the first `cap`
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(rest)), inverse))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(len(rest)) - starts[inverse[order]]
+    keep[rest[order[rank < cap]]] = True
+    return np.flatnonzero(keep)
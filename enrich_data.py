@@ -1,16 +1,55 @@
+import hashlib
+import io
+import os
+
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-def enrich_data(input_path, output_path):
-    print("Loading raw data...")
-    df = pd.read_csv(input_path)
+from cube import CUBE_SOURCE_COLUMNS, build_cube, combine_cubes
+from data_store import (csv_source, cube_path_for, manifest_path_for, next_part_path, parquet_parts,
+                        parquet_path_for, remove_parts, tag_source, to_arrow_table)
+from macro import DEFAULT_MACRO_PATH, join_macro, load_macro_table, macro_table_version
+from trade_rules import DEFAULT_RULES_PATH, TradeRuleRegistry
+
+# Bump whenever enrich_frame() changes what it computes or the manifest changes layout,
+# so incremental runs rebuild
+ENRICHMENT_VERSION = "3"
+
+# Dtypes of the raw columns, pinned so every read (whole file, chunk or delta) parses a column
+# the same way: a chunk with a blank unit count must not turn that column into floats
+RAW_DTYPES = {
+    'country': 'object',
+    'product_name': 'object',
+    'product_type': 'object',
+    'price_before_USD': 'float64',
+    'price_after_USD': 'float64',
+    'tariff_pct': 'float64',
+    'date': 'object',
+    'units_sold_before': 'Int64',
+    'units_sold_after': 'Int64',
+    'latitude': 'float64',
+    'longitude': 'float64',
+}
+
+def read_raw(path, **kwargs):
+    """Read a raw tariff CSV (or an iterator of chunks, with `chunksize`) with RAW_DTYPES."""
+    return pd.read_csv(path, dtype=RAW_DTYPES, **kwargs)
+
+def enrich_frame(df, registry, macro_table, verbose=True):
+    """Add the economic, macro and trade list columns to a raw tariff frame (in place)."""
+    log = print if verbose else (lambda *args: None)
 
-    print("Calculating economic logic...")
+    log("Calculating economic logic...")
     # Price Elasticity of Demand (PED) = % change in quantity / % change in price
     # Prevent division by zero
     price_pct_change = (df['price_after_USD'] - df['price_before_USD']) / df['price_before_USD']
     price_pct_change = price_pct_change.replace(0, np.nan)
-    qty_pct_change = (df['units_sold_after'] - df['units_sold_before']) / df['units_sold_before']
+    # Unit counts are nullable integers; the metrics derived from them stay plain float64
+    units_before = df['units_sold_before'].astype('float64')
+    units_after = df['units_sold_after'].astype('float64')
+    qty_pct_change = (units_after - units_before) / units_before
     
     df['Price_Delta_Pct'] = price_pct_change
     df['Volume_Delta_Pct'] = qty_pct_change
@@ -19,64 +58,333 @@ def enrich_data(input_path, output_path):
     # Revenue Loss (or Gain) due to Volume drops
     # Actually, Revenue Before = units_before * price_before
     # Revenue After = units_after * price_after
-    df['Revenue_Before'] = df['units_sold_before'] * df['price_before_USD']
-    df['Revenue_After'] = df['units_sold_after'] * df['price_after_USD']
+    df['Revenue_Before'] = units_before * df['price_before_USD']
+    df['Revenue_After'] = units_after * df['price_after_USD']
     df['Revenue_Loss'] = df['Revenue_Before'] - df['Revenue_After'] # Positive means loss
     # Alternatively, the spec says: "Revenue Loss" projections due to sales volume drops: (Units_Sold_Before - Units_Sold_After) * Price_After
-    df['Volume_Driven_Revenue_Loss'] = (df['units_sold_before'] - df['units_sold_after']) * df['price_after_USD']
-
-    print("Mapping Macro Indicators...")
-    # Mock data for GDP (Trillions USD) and CPI (Inflation Rate %)
-    macro_data = {
-        'USA': {'GDP_Trillions': 25.4, 'CPI_Pct': 3.2},
-        'China': {'GDP_Trillions': 17.9, 'CPI_Pct': 2.1},
-        'Germany': {'GDP_Trillions': 4.0, 'CPI_Pct': 5.9},
-        'Japan': {'GDP_Trillions': 4.2, 'CPI_Pct': 3.3},
-        'India': {'GDP_Trillions': 3.4, 'CPI_Pct': 4.5},
-        'UK': {'GDP_Trillions': 3.0, 'CPI_Pct': 6.8},
-        'France': {'GDP_Trillions': 2.7, 'CPI_Pct': 5.2},
-        'Brazil': {'GDP_Trillions': 1.9, 'CPI_Pct': 4.1},
-        'Australia': {'GDP_Trillions': 1.7, 'CPI_Pct': 5.6},
-        'South Korea': {'GDP_Trillions': 1.6, 'CPI_Pct': 3.6},
-        'Mexico': {'GDP_Trillions': 1.4, 'CPI_Pct': 4.6},
-        'Canada': {'GDP_Trillions': 2.1, 'CPI_Pct': 3.9},
-        'Portugal': {'GDP_Trillions': 0.25, 'CPI_Pct': 4.3},
-        'South Africa': {'GDP_Trillions': 0.4, 'CPI_Pct': 5.4},
-        'Argentina': {'GDP_Trillions': 0.6, 'CPI_Pct': 104.0},
-        'Norway': {'GDP_Trillions': 0.5, 'CPI_Pct': 5.8},
-        'Egypt': {'GDP_Trillions': 0.4, 'CPI_Pct': 24.4},
-        'Chile': {'GDP_Trillions': 0.3, 'CPI_Pct': 7.6}
-    }
-    
-    df['GDP_Trillions'] = df['country'].map(lambda x: macro_data.get(x, {}).get('GDP_Trillions', np.nan))
-    df['CPI_Pct'] = df['country'].map(lambda x: macro_data.get(x, {}).get('CPI_Pct', np.nan))
-
-    print("Checking Trade List Validation...")
-    # Validation: Section 232 (e.g., steel/aluminum - map closely via 'Car Parts' maybe) 
-    # Section 301 (Chinese goods - applies to China)
-    def map_trade_list(row):
-        trade_lists = []
-        if row['country'] == 'China':
-            trade_lists.append("Section 301")
-        if row['product_type'] in ['Automobiles', 'Electronics']:
-            trade_lists.append("Potential Section 232/Tech Restrictions")
-        return " | ".join(trade_lists) if trade_lists else "Standard"
-        
-    df['Trade_List_Status'] = df.apply(map_trade_list, axis=1)
+    df['Volume_Driven_Revenue_Loss'] = (units_before - units_after) * df['price_after_USD']
 
     # YoY Impact Mapping
     # Since dataset is "Tariff_Impact_Analysis_2025", we just ensure date format
     df['date'] = pd.to_datetime(df['date'], dayfirst=True)
+
+    log("Mapping Macro Indicators...")
+    # GDP (Trillions USD) and CPI (Inflation Rate %) per country and year (macro_indicators.csv)
+    join_macro(df, macro_table, df['date'].dt.year)
+
+    log("Checking Trade List Validation...")
+    # Section 301 / Section 232 list membership comes from the rule registry (trade_rules.csv)
+    df['Trade_List_Status'] = registry.classify(df)
+
     df['Year'] = df['date'].dt.year
+    return df
+
+def row_hashes(raw):
+    """One uint64 content hash per raw row."""
+    return pd.util.hash_pandas_object(raw, index=False).to_numpy()
+
+def row_keys(hashes):
+    """Row hashes made unique by occurrence, so repeated identical rows are matched one for one."""
+    occurrence = pd.Series(hashes).groupby(hashes).cumcount().to_numpy()
+    return pd.util.hash_pandas_object(pd.DataFrame({'h': hashes, 'n': occurrence}), index=False).to_numpy()
+
+def raw_state(path):
+    """Size and sha256 digest of a raw file; the size is 0 unless the file ends with a newline,
+    since a line appended to an unterminated file would extend its last row."""
+    digest = hashlib.sha256()
+    size = 0
+    last = b''
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+            size += len(block)
+            last = block[-1:]
+    return (size if last == b'\n' else 0), digest.hexdigest()
+
+def inputs_fingerprint(*paths):
+    """Digest of the enrichment code version and the reference files it reads."""
+    digest = hashlib.sha256(ENRICHMENT_VERSION.encode())
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def write_manifest(manifest_path, hashes, fingerprint, state, append=False):
+    """Write the store's row hashes with the inputs fingerprint and the raw file's `state`.
+
+    With `append` the hashes are rows added to the end of the store and go into a new part.
+    """
+    size, digest = state
+    table = pa.table({'row_hash': pa.array(hashes, pa.uint64())})
+    table = table.replace_schema_metadata({'inputs': fingerprint, 'raw_bytes': str(size), 'raw_sha256': digest})
+    if append:
+        pq.write_table(table, next_part_path(manifest_path))
+    else:
+        pq.write_table(table, manifest_path)
+        remove_parts(manifest_path)
+
+def read_manifest(manifest_path, fingerprint, hashes=True):
+    """The current enriched store's manifest, or None if missing or built from other inputs.
+
+    A dict of its 'rows', the 'raw_bytes' and 'raw_sha256' of the raw file it was last
+    brought up to date with and, with `hashes`, the row hashes in store order.
+    """
+    if not os.path.exists(manifest_path):
+        return None
+    parts = parquet_parts(manifest_path)
+    metadata = [pq.read_metadata(part) for part in parts]
+    if any((m.metadata or {}).get(b'inputs') != fingerprint.encode() for m in metadata):
+        return None
+    latest = metadata[-1].metadata
+    manifest = {
+        'rows': sum(m.num_rows for m in metadata),
+        'raw_bytes': int(latest.get(b'raw_bytes', 0)),
+        'raw_sha256': latest.get(b'raw_sha256', b'').decode(),
+    }
+    if hashes:
+        manifest['hashes'] = np.concatenate([pq.read_table(part).column('row_hash').to_numpy() for part in parts])
+    return manifest
+
+def stored_rows(parquet_path):
+    """Rows in a Parquet copy and its appended parts, from their footers."""
+    return sum(pq.read_metadata(part).num_rows for part in parquet_parts(parquet_path))
+
+def enrich_data(input_path, output_path, rules_path=DEFAULT_RULES_PATH, chunksize=None, write_parquet=True,
+                macro_path=DEFAULT_MACRO_PATH):
+    """Enrich the raw CSV at `input_path` and write the result to `output_path`.
+
+    Unless `write_parquet` is False, a typed Parquet copy (categorical keys, float32
+    metrics, datetime `date`) is written next to the CSV for the dashboards to load.
+    The aggregate cube the dashboards query is always written next to it.
+
+    With `chunksize` set, the input is streamed `chunksize` rows at a time and every
+    enriched chunk is appended to the output, so peak memory is bounded by the chunk
+    rather than the file. Every read uses RAW_DTYPES, so the bytes written match the
+    in-memory path whatever values a single chunk happens to hold.
+    """
+    registry = TradeRuleRegistry.from_file(rules_path)
+    macro_table = load_macro_table(macro_path)
+    print(f"Using macro reference table version {macro_table_version(macro_path)}.")
+
+    parquet_path = parquet_path_for(output_path) if write_parquet else None
+    manifest_path = manifest_path_for(output_path)
+
+    if chunksize:
+        # Streaming does not hash rows, so drop any manifest that no longer describes the store
+        if os.path.exists(manifest_path):
+            remove_parts(manifest_path)
+            os.remove(manifest_path)
+        if parquet_path:
+            remove_parts(parquet_path)
+        print(f"Streaming raw data in chunks of {chunksize:,} rows...")
+        n_rows = 0
+        writer = None
+        cubes = []
+        try:
+            with open(output_path, 'w', newline='') as out:
+                for i, chunk in enumerate(read_raw(input_path, chunksize=chunksize)):
+                    enrich_frame(chunk, registry, macro_table, verbose=False)
+                    chunk.to_csv(out, header=i == 0, index=False)
+                    if parquet_path:
+                        # Every row group is cast to the first chunk's schema
+                        table = to_arrow_table(chunk, writer.schema if writer else None)
+                        writer = writer or pq.ParquetWriter(parquet_path, table.schema)
+                        writer.write_table(table)
+                    # Chunk cubes stay small, so merge them as we go rather than holding one per chunk
+                    cubes = [combine_cubes(cubes + [build_cube(chunk)])]
+                    n_rows += len(chunk)
+            if writer:
+                writer.add_key_value_metadata(csv_source(output_path))
+        finally:
+            if writer:
+                writer.close()
+        if cubes:
+            write_cube(cubes[0], output_path)
+        print(f"Enriched {n_rows:,} rows into {output_path}.")
+        print("ETL complete.")
+        return
+
+    print("Loading raw data...")
+    df = read_raw(input_path)
+    hashes = row_hashes(df)
+    enrich_frame(df, registry, macro_table)
 
     print(f"Saving enriched dataset to {output_path}...")
     df.to_csv(output_path, index=False)
+    if parquet_path:
+        print(f"Saving typed Parquet copy to {parquet_path}...")
+        pq.write_table(tag_source(to_arrow_table(df), output_path), parquet_path)
+        remove_parts(parquet_path)
+    write_cube(build_cube(df), output_path)
+    write_manifest(manifest_path, hashes, inputs_fingerprint(rules_path, macro_path), raw_state(input_path))
+    print("ETL complete.")
+
+def write_cube(cube, output_path):
+    cube_path = cube_path_for(output_path)
+    print(f"Saving aggregate cube ({len(cube):,} cells) to {cube_path}...")
+    cube.to_parquet(cube_path, index=False)
+
+def _rewrite_csv(output_path, keep, delta):
+    """Drop the CSV data lines where `keep` is False and append `delta`; False if the CSV is out of sync."""
+    tmp_path = output_path + ".tmp"
+    n_lines = 0
+    with open(output_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        dst.write(src.readline())
+        for n_lines, line in enumerate(src, start=1):
+            if n_lines <= len(keep) and keep[n_lines - 1]:
+                dst.write(line)
+    if n_lines != len(keep):
+        os.remove(tmp_path)
+        return False
+    if len(delta):
+        with open(tmp_path, 'a', newline='') as dst:
+            delta.to_csv(dst, header=False, index=False)
+    os.replace(tmp_path, output_path)
+    return True
+
+def _read_appended(input_path, manifest):
+    """Raw rows after the bytes the manifest was built from and the raw file's new state,
+    or None unless the raw file still starts with exactly those bytes."""
+    size = manifest['raw_bytes']
+    if not size or os.path.getsize(input_path) < size:
+        return None
+    digest = hashlib.sha256()
+    with open(input_path, 'rb') as f:
+        header = f.readline()
+        f.seek(0)
+        remaining = size
+        while remaining:
+            block = f.read(min(remaining, 1 << 20))
+            digest.update(block)
+            remaining -= len(block)
+        if digest.hexdigest() != manifest['raw_sha256']:
+            return None
+        tail = f.read()
+    digest.update(tail)
+    state = (size + len(tail) if tail.endswith(b'\n') or not tail else 0), digest.hexdigest()
+    return read_raw(io.BytesIO(header + tail)), state
+
+def _append_rows(output_path, parquet_path, delta):
+    """Add enriched rows to the end of the store: CSV lines, a new Parquet part and the cube."""
+    start = os.path.getsize(output_path)
+    with open(output_path, 'a', newline='') as out:
+        delta.to_csv(out, header=False, index=False)
+    if parquet_path:
+        table = to_arrow_table(delta, pq.read_schema(parquet_path))
+        pq.write_table(tag_source(table, output_path, start), next_part_path(parquet_path))
+    # Cube measures are sums, so the new rows' cube merges straight into the stored one
+    cube = pd.read_parquet(cube_path_for(output_path))
+    write_cube(combine_cubes([cube, build_cube(delta)]), output_path)
+
+def enrich_incremental(input_path, output_path, rules_path=DEFAULT_RULES_PATH, write_parquet=True,
+                       macro_path=DEFAULT_MACRO_PATH):
+    """Enrich only the raw rows that are new or changed since the last run and merge them in.
+
+    The manifest next to the output holds one content hash per enriched row and the size
+    and digest of the raw file it was built from. If the raw file still starts with those
+    bytes, only the lines after them are parsed and enriched; the prefix is read for its
+    digest alone. Otherwise every raw row is hashed: rows whose hash is already there are
+    reused as-is, rows whose hash disappeared from the input are dropped, and only the
+    remaining delta goes through enrich_frame().
+
+    New rows alone are appended to the CSV, written as a new Parquet part and merged into
+    the stored cube, so the cost follows the new rows. Once rows are retired, the CSV,
+    Parquet copy and cube are rewritten whole, with changed rows re-emitted at the end of
+    the store. A missing or stale manifest (different rules file, macro table or
+    ENRICHMENT_VERSION) falls back to a full enrich_data() run.
+    """
+    parquet_path = parquet_path_for(output_path) if write_parquet else None
+    manifest_path = manifest_path_for(output_path)
+    fingerprint = inputs_fingerprint(rules_path, macro_path)
+
+    manifest = read_manifest(manifest_path, fingerprint, hashes=False)
+    usable = (
+        manifest is not None
+        and os.path.exists(output_path)
+        and os.path.exists(cube_path_for(output_path))
+        and (not parquet_path or (os.path.exists(parquet_path) and stored_rows(parquet_path) == manifest['rows']))
+    )
+    if not usable:
+        print("No usable manifest for this store, running a full enrichment...")
+        enrich_data(input_path, output_path, rules_path, write_parquet=write_parquet, macro_path=macro_path)
+        return
+
+    appended = _read_appended(input_path, manifest)
+    if appended is not None:
+        delta, state = appended
+        print(f"{len(delta):,} rows appended to the raw file since the last run.")
+        if not len(delta):
+            print("Enriched store is up to date.")
+            return
+        hashes = row_hashes(delta)
+        enrich_frame(delta, TradeRuleRegistry.from_file(rules_path), load_macro_table(macro_path), verbose=False)
+        print(f"Appending to {output_path}...")
+        _append_rows(output_path, parquet_path, delta)
+        write_manifest(manifest_path, hashes, fingerprint, state, append=True)
+        print("ETL complete.")
+        return
+
+    print("Loading raw data...")
+    raw = read_raw(input_path)
+    hashes = row_hashes(raw)
+    state = raw_state(input_path)
+    previous = read_manifest(manifest_path, fingerprint)['hashes']
+    previous_keys, keys = row_keys(previous), row_keys(hashes)
+    keep = np.isin(previous_keys, keys)
+    fresh = ~np.isin(keys, previous_keys)
+    print(f"{fresh.sum():,} new or changed rows, {(~keep).sum():,} retired, {keep.sum():,} reused.")
+    if keep.all() and not fresh.any():
+        # Record the raw file as it is now, so the next run can look for appended bytes alone
+        write_manifest(manifest_path, previous, fingerprint, state)
+        print("Enriched store is up to date.")
+        return
+
+    delta = raw[fresh].reset_index(drop=True)
+    enrich_frame(delta, TradeRuleRegistry.from_file(rules_path), load_macro_table(macro_path), verbose=False)
+
+    if keep.all():
+        print(f"Appending to {output_path}...")
+        _append_rows(output_path, parquet_path, delta)
+        write_manifest(manifest_path, hashes[fresh], fingerprint, state, append=True)
+        print("ETL complete.")
+        return
+
+    print(f"Merging into {output_path}...")
+    if not _rewrite_csv(output_path, keep, delta):
+        print("Enriched CSV does not match its manifest, running a full enrichment...")
+        enrich_data(input_path, output_path, rules_path, write_parquet=write_parquet, macro_path=macro_path)
+        return
+
+    if parquet_path:
+        table = pa.concat_tables([pq.read_table(part) for part in parquet_parts(parquet_path)])
+        table = table.filter(pa.array(keep))
+        if len(delta):
+            table = pa.concat_tables([table, to_arrow_table(delta, table.schema)])
+        pq.write_table(tag_source(table, output_path), parquet_path)
+        remove_parts(parquet_path)
+    # Sums over retired rows cannot be subtracted back out exactly, so rebuild from the merged store.
+    # Read from the CSV, whose float64 values round-trip to a full run's; the Parquet copy holds float32.
+    store = pd.read_csv(output_path, usecols=lambda c: c in CUBE_SOURCE_COLUMNS, parse_dates=['date'],
+                        float_precision='round_trip')
+    write_cube(build_cube(store), output_path)
+
+    write_manifest(manifest_path, np.concatenate([previous[keep], hashes[fresh]]), fingerprint, state)
     print("ETL complete.")
 
 if __name__ == "__main__":
-    import os
+    import argparse
     # Move to the correct base dir where the data resides
     base_dir = "/media/cledenir/File_Manager/Data - Development/Projects/Tariff Impact Analysis/Tariff-Impact-Analysis"
-    input_file = os.path.join(base_dir, "Tariff_Impact_Analysis_2025.csv")
-    output_file = os.path.join(base_dir, "Tariff_Impact_Analysis_Enriched.csv")
-    enrich_data(input_file, output_file)
+    parser = argparse.ArgumentParser(description="Enrich the raw tariff dataset.")
+    parser.add_argument("--input", default=os.path.join(base_dir, "Tariff_Impact_Analysis_2025.csv"))
+    parser.add_argument("--output", default=os.path.join(base_dir, "Tariff_Impact_Analysis_Enriched.csv"))
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="stream the input this many rows at a time instead of loading it whole")
+    parser.add_argument("--no-parquet", action="store_true", help="skip the typed Parquet copy")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only enrich rows that are new or changed since the last run")
+    args = parser.parse_args()
+    if args.incremental:
+        enrich_incremental(args.input, args.output, write_parquet=not args.no_parquet)
+    else:
+        enrich_data(args.input, args.output, chunksize=args.chunksize, write_parquet=not args.no_parquet)
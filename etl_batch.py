@@ -0,0 +1,105 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pyarrow.parquet as pq
+
+from data_store import to_arrow_table
+from enrich_data import enrich_frame, read_raw
+from macro import DEFAULT_MACRO_PATH, load_macro_table
+from trade_rules import DEFAULT_RULES_PATH, TradeRuleRegistry
+
+DEFAULT_PARTITIONS = ('country', 'Year')
+
+
+def discover_inputs(source):
+    """Raw CSVs from a directory (non-recursive) or a glob pattern, in a stable order."""
+    if os.path.isdir(source):
+        source = os.path.join(source, "*.csv")
+    return sorted(glob.glob(source))
+
+
+def enrich_file(input_path, output_dir, rules_path=DEFAULT_RULES_PATH, partition_cols=DEFAULT_PARTITIONS,
+                macro_path=DEFAULT_MACRO_PATH):
+    """Enrich one raw file into the hive-partitioned Parquet dataset at `output_dir`.
+
+    Runs inside a worker process and never raises: the outcome is returned as a dict
+    so one bad file cannot take the rest of the batch down with it.
+    """
+    start = time.perf_counter()
+    result = {'path': input_path, 'rows': 0, 'seconds': 0.0, 'error': None}
+    try:
+        df = read_raw(input_path)
+        enrich_frame(df, TradeRuleRegistry.from_file(rules_path), load_macro_table(macro_path), verbose=False)
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        # Named after the source file, so re-running a file replaces its own parts only
+        pq.write_to_dataset(
+            to_arrow_table(df), output_dir,
+            partition_cols=list(partition_cols),
+            basename_template=f"{stem}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+        )
+        result['rows'] = len(df)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def enrich_batch(source, output_dir, rules_path=DEFAULT_RULES_PATH, partition_cols=DEFAULT_PARTITIONS, max_workers=None,
+                 macro_path=DEFAULT_MACRO_PATH):
+    """Enrich every raw file matched by `source` across a process pool; returns per-file results."""
+    inputs = discover_inputs(source)
+    if not inputs:
+        print(f"No raw files matched {source}.")
+        return []
+
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"Enriching {len(inputs)} files into {output_dir}...")
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(enrich_file, path, output_dir, rules_path, partition_cols, macro_path): path
+            for path in inputs
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. killed for memory); record it and carry on
+                result = {'path': futures[future], 'rows': 0, 'seconds': 0.0,
+                          'error': f"{type(e).__name__}: {e}"}
+            results.append(result)
+    elapsed = time.perf_counter() - start
+
+    results.sort(key=lambda r: r['path'])
+    print_report(results, elapsed)
+    return results
+
+
+def print_report(results, elapsed):
+    width = max(len(os.path.basename(r['path'])) for r in results)
+    for r in results:
+        name = os.path.basename(r['path'])
+        if r['error']:
+            print(f"  {name:<{width}}  FAILED after {r['seconds']:.2f}s  {r['error']}")
+        else:
+            rate = r['rows'] / r['seconds'] if r['seconds'] else 0
+            print(f"  {name:<{width}}  {r['rows']:>10,} rows  {r['seconds']:7.2f}s  {rate:>12,.0f} rows/s")
+    failed = sum(1 for r in results if r['error'])
+    total_rows = sum(r['rows'] for r in results)
+    print(f"Batch complete: {len(results) - failed} ok, {failed} failed, {total_rows:,} rows in {elapsed:.2f}s.")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Enrich many raw tariff files in parallel.")
+    parser.add_argument("source", help="directory of raw CSVs or a glob pattern such as 'raw/*_2025-*.csv'")
+    parser.add_argument("--output", default="Tariff_Impact_Analysis_Enriched_partitions")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--partition-by", nargs="+", default=list(DEFAULT_PARTITIONS))
+    args = parser.parse_args()
+    results = enrich_batch(args.source, args.output, partition_cols=args.partition_by, max_workers=args.workers)
+    raise SystemExit(1 if any(r['error'] for r in results) else 0)
@@ -0,0 +1,73 @@
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+
+
+class FigureCache:
+    """LRU of serialized Plotly figures, bounded by the total size of their JSON.
+
+    Keys describe what a figure shows, e.g. (chart, country, sector, currency). On a hit
+    the stored JSON is turned back into a Figure without re-running Plotly's property
+    validation, so repeat views skip figure construction entirely. Entries belong to
+    one data version; sync() with a new version drops them all. The cache is shared by
+    every session's script thread, so its entries are only touched under a lock; a
+    figure is built outside it, so two sessions may occasionally build the same one.
+    """
+
+    def __init__(self, max_bytes=32 * 2**20):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def sync(self, version):
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self.bytes = 0
+                self._version = version
+
+    def get(self, key):
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+        # The spec was produced by a validated Figure, so validating it again is wasted work
+        return go.Figure(json.loads(spec), _validate=False)
+
+    def put(self, key, fig):
+        spec = fig.to_json()
+        if len(spec) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= len(self._entries.pop(key))
+            self._entries[key] = spec
+            self.bytes += len(spec)
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def get_or_build(self, key, build):
+        """The cached figure for `key`, or `build()`'s result after caching it."""
+        fig = self.get(key)
+        if fig is None:
+            fig = build()
+            self.put(key, fig)
+        return fig
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries),
+                    'bytes': self.bytes, 'max_bytes': self.max_bytes}
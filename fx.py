@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_FX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fx_rates.csv")
+BASE_CURRENCY = 'USD'
+
+
+class FxTable:
+    """Dated display-currency rates (units per 1 USD) with spot and as-of lookups.
+
+    Totals are meant to be aggregated in USD and converted afterwards with convert(),
+    which costs O(groups). rates_asof()/convert_rows() give each row the rate in force
+    on its own date, for the cases where historical per-row conversion is needed.
+    """
+
+    def __init__(self, rates, version=None):
+        rates = rates.assign(date=pd.to_datetime(rates['date'])).sort_values(['currency', 'date'])
+        if rates.duplicated(['currency', 'date']).any():
+            raise ValueError("Duplicate (currency, date) rows in the FX table")
+        self.version = version
+        self._dates = {}
+        self._rates = {}
+        for currency, group in rates.groupby('currency', sort=False):
+            self._dates[currency] = group['date'].to_numpy('datetime64[ns]')
+            self._rates[currency] = group['rate_per_usd'].to_numpy('float64')
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_FX_PATH):
+        rates = pd.read_csv(path, comment='#', skipinitialspace=True)
+        return cls(rates, version=(os.path.abspath(path), os.path.getmtime(path)))
+
+    @property
+    def currencies(self):
+        return [BASE_CURRENCY] + sorted(self._rates)
+
+    def rate(self, currency, as_of=None):
+        """Rate in force on `as_of` (default: the latest published rate)."""
+        if currency == BASE_CURRENCY:
+            return 1.0
+        rates = self._rates[currency]
+        if as_of is None:
+            return float(rates[-1])
+        pos = np.searchsorted(self._dates[currency], np.datetime64(pd.Timestamp(as_of), 'ns'), side='right') - 1
+        return float(rates[max(pos, 0)])
+
+    def convert(self, totals, currency, columns, as_of=None):
+        """Copy of an aggregated USD frame with `columns` converted at a single rate."""
+        rate = self.rate(currency, as_of)
+        return totals.assign(**{col: totals[col] * rate for col in columns})
+
+    def rates_asof(self, currency, dates):
+        """Per-date rates as a vectorized as-of lookup: the latest rate dated on or before each date.
+
+        Dates before the first published rate get the earliest one; missing dates get the latest.
+        """
+        dates = pd.to_datetime(pd.Series(dates), errors='coerce').to_numpy('datetime64[ns]')
+        if currency == BASE_CURRENCY:
+            return np.ones(len(dates))
+        known = self._dates[currency]
+        pos = np.searchsorted(known, dates, side='right') - 1
+        pos[np.isnat(dates)] = len(known) - 1
+        return self._rates[currency][np.clip(pos, 0, None)]
+
+    def convert_rows(self, df, currency, column, date_col='date'):
+        """`column` of `df` converted at each row's historical rate, as a Series."""
+        return df[column] * self.rates_asof(currency, df[date_col])
@@ -0,0 +1,52 @@
+import numpy as np
+
+# Country reference data shared by the dashboards and the aggregation layer
+REGION_MAP = {
+    'USA': 'North America', 'Canada': 'North America', 'Mexico': 'North America',
+    'China': 'Asia', 'Japan': 'Asia', 'India': 'Asia', 'South Korea': 'Asia',
+    'Germany': 'Europe', 'UK': 'Europe', 'France': 'Europe', 'Portugal': 'Europe', 'Norway': 'Europe',
+    'Brazil': 'South America', 'Argentina': 'South America', 'Chile': 'South America',
+    'Australia': 'Oceania',
+    'South Africa': 'Africa', 'Egypt': 'Africa'
+}
+DEFAULT_REGION = 'Other'
+
+ISO_A3 = {
+    'USA': 'USA', 'China': 'CHN', 'Germany': 'DEU', 'Japan': 'JPN',
+    'India': 'IND', 'UK': 'GBR', 'France': 'FRA', 'Brazil': 'BRA',
+    'Australia': 'AUS', 'South Korea': 'KOR', 'Mexico': 'MEX', 'Canada': 'CAN',
+    'Portugal': 'PRT', 'South Africa': 'ZAF', 'Argentina': 'ARG',
+    'Norway': 'NOR', 'Egypt': 'EGY', 'Chile': 'CHL'
+}
+
+# Map anchor (lat, lon) per country
+COUNTRY_COORDS = {
+    'USA': (39.8283, -98.5795), 'China': (35.8617, 104.1954), 'Germany': (51.1657, 10.4515),
+    'Japan': (36.2048, 138.2529), 'India': (20.5937, 78.9629), 'UK': (55.3781, -3.4360),
+    'France': (46.2276, 2.2137), 'Brazil': (-14.2350, -51.9253), 'Australia': (-25.2744, 133.7751),
+    'South Korea': (35.9078, 127.7669), 'Mexico': (23.6345, -102.5528), 'Canada': (56.1304, -106.3468),
+    'Portugal': (39.3999, -8.2245), 'South Africa': (-30.5595, 22.9375), 'Argentina': (-38.4161, -63.6167),
+    'Norway': (60.4720, 8.4689), 'Egypt': (26.8206, 30.8025), 'Chile': (-35.6751, -71.5430)
+}
+
+CONTINENT_LABELS = [
+    dict(lat=48, lon=-100, text='NORTH AMERICA'),
+    dict(lat=-15, lon=-58, text='SOUTH AMERICA'),
+    dict(lat=52, lon=15, text='EUROPE'),
+    dict(lat=5, lon=22, text='AFRICA'),
+    dict(lat=42, lon=85, text='ASIA'),
+    dict(lat=-25, lon=135, text='OCEANIA'),
+]
+
+
+def region_of(countries):
+    """Region name for each value of a country Series, 'Other' for unmapped countries."""
+    return countries.astype(object).map(REGION_MAP).fillna(DEFAULT_REGION)
+
+
+def coords_of(countries):
+    """(latitude, longitude) arrays for a country Series; unknown countries sit at (0, 0)."""
+    pairs = [COUNTRY_COORDS.get(c, (0, 0)) for c in countries]
+    coords = np.array(pairs, dtype=float).reshape(-1, 2)
+    return coords[:, 0], coords[:, 1]
+
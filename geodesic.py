@@ -0,0 +1,81 @@
+import threading
+
+import numpy as np
+
+from geo import COUNTRY_COORDS
+
+# Arcs computed so far, keyed by ((lat, lon), (lat, lon), n_points); shared by every
+# session's script thread, so only read or changed while holding _ARC_LOCK
+_ARC_CACHE = {}
+_ARC_LOCK = threading.Lock()
+MAX_CACHED_ARCS = 4096
+
+
+def _unit_vectors(lats, lons):
+    lat, lon = np.radians(lats), np.radians(lons)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def great_circle_arcs(origins, destinations, n_points=40):
+    """Great-circle paths between paired points, all computed in one broadcast.
+
+    `origins` and `destinations` are (k, 2) sequences of (lat, lon) in degrees. Returns
+    (lats, lons) arrays of shape (k, n_points), spherically interpolated from origin
+    to destination, with longitudes in [-180, 180]. Antipodal pairs, which have no
+    unique great circle, stay at the origin.
+    """
+    origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+    destinations = np.asarray(destinations, dtype=float).reshape(-1, 2)
+    p0 = _unit_vectors(origins[:, 0], origins[:, 1])[:, None, :]
+    p1 = _unit_vectors(destinations[:, 0], destinations[:, 1])[:, None, :]
+
+    omega = np.arccos(np.clip((p0 * p1).sum(axis=-1), -1.0, 1.0))
+    sin_omega = np.sin(omega)
+    t = np.linspace(0, 1, n_points)[None, :]
+    degenerate = sin_omega < 1e-12
+    safe = np.where(degenerate, 1.0, sin_omega)
+    w0 = np.where(degenerate, 1.0, np.sin((1 - t) * omega) / safe)[..., None]
+    w1 = np.where(degenerate, 0.0, np.sin(t * omega) / safe)[..., None]
+    points = w0 * p0 + w1 * p1
+
+    lats = np.degrees(np.arctan2(points[..., 2], np.hypot(points[..., 0], points[..., 1])))
+    lons = np.degrees(np.arctan2(points[..., 1], points[..., 0]))
+    return lats, lons
+
+
+def arc_paths(pairs, n_points=40):
+    """Packed great-circle paths for ((lat, lon), (lat, lon)) pairs, ready for one line trace.
+
+    Each arc's vertices are followed by a NaN break. Arcs are cached by (pair, n_points),
+    so only pairs never drawn before are computed, together in one batch.
+    """
+    pairs = [(tuple(map(float, a)), tuple(map(float, b))) for a, b in pairs]
+    if not pairs:
+        return np.empty(0), np.empty(0)
+    with _ARC_LOCK:
+        missing = list(dict.fromkeys(p for p in pairs if (p[0], p[1], n_points) not in _ARC_CACHE))
+        if missing:
+            if len(_ARC_CACHE) + len(missing) > MAX_CACHED_ARCS:
+                # Clearing also drops the pairs found cached above, so compute them all again
+                _ARC_CACHE.clear()
+                missing = list(dict.fromkeys(pairs))
+            lats, lons = great_circle_arcs([a for a, _ in missing], [b for _, b in missing], n_points)
+            for (a, b), arc_lats, arc_lons in zip(missing, lats, lons):
+                arc = (np.append(arc_lats, np.nan), np.append(arc_lons, np.nan))
+                for part in arc:
+                    part.flags.writeable = False
+                _ARC_CACHE[(a, b, n_points)] = arc
+        arcs = [_ARC_CACHE[(a, b, n_points)] for a, b in pairs]
+    return np.concatenate([lat for lat, _ in arcs]), np.concatenate([lon for _, lon in arcs])
+
+
+def country_flows(pairs, n_points=40):
+    """arc_paths() for (origin country, destination country) name pairs; unknown countries are skipped."""
+    known = [(COUNTRY_COORDS[a], COUNTRY_COORDS[b]) for a, b in pairs if a in COUNTRY_COORDS and b in COUNTRY_COORDS]
+    return arc_paths(known, n_points)
+
+
+def all_country_pairs(countries):
+    """Every unordered pair of distinct countries, e.g. to draw the full flow network."""
+    countries = list(dict.fromkeys(countries))
+    return [(a, b) for i, a in enumerate(countries) for b in countries[i + 1:]]
@@ -0,0 +1,18 @@
+import threading
+
+# Per-thread list of (group keys, input rows); Streamlit runs each rerun on its session's
+# script thread, so a log started at the top of a rerun sees only that rerun's groupbys
+_local = threading.local()
+
+
+def start_groupby_log():
+    """Start a fresh log for the calling thread and return it; it fills as groupbys run."""
+    _local.log = []
+    return _local.log
+
+
+def record_groupby(keys, rows):
+    """Note that `rows` input rows were grouped by `keys`, if the calling thread keeps a log."""
+    log = getattr(_local, 'log', None)
+    if log is not None:
+        log.append((tuple(keys), rows))
@@ -0,0 +1,62 @@
+import numpy as np
+
+from groupby_log import record_groupby
+
+
+def _path_ids(keys, sep):
+    ids = keys.iloc[:, 0]
+    for col in keys.columns[1:]:
+        ids = ids + sep + keys[col]
+    return ids.to_numpy(dtype=object)
+
+
+def build_hierarchy(frame, levels, value_col, root='World', sep=' - '):
+    """Sunburst/treemap node arrays for `frame` rolled up along `levels`, any depth.
+
+    Returns a dict of numpy arrays `ids`, `labels`, `parents`, `values` and `depth`:
+    the root first, then every node of each level in turn (sorted by path), with
+    values summed bottom-up so branchvalues='total' holds. A node's id is its path
+    joined with `sep` (e.g. "Asia - China - Electronics"); first-level ids are just
+    their label and hang off `root`.
+    """
+    levels = list(levels)
+    record_groupby(levels, len(frame))
+    current = frame.groupby(levels, observed=True, sort=True)[value_col].sum().reset_index()
+
+    tiers = []
+    for depth in range(len(levels), 0, -1):
+        if depth < len(levels):
+            # Each level is rolled up from the one below it, not from the rows again
+            record_groupby(levels[:depth], len(current))
+            current = current.groupby(levels[:depth], observed=True, sort=True)[value_col].sum().reset_index()
+        keys = current[levels[:depth]].astype(str)
+        parents = _path_ids(keys.iloc[:, :-1], sep) if depth > 1 else np.full(len(keys), root, dtype=object)
+        tiers.append((depth, _path_ids(keys, sep), keys.iloc[:, -1].to_numpy(dtype=object), parents,
+                      current[value_col].to_numpy(dtype=float)))
+    tiers.reverse()
+
+    return {
+        'ids': np.concatenate([np.array([root], dtype=object)] + [t[1] for t in tiers]),
+        'labels': np.concatenate([np.array([root], dtype=object)] + [t[2] for t in tiers]),
+        'parents': np.concatenate([np.array([''], dtype=object)] + [t[3] for t in tiers]),
+        'values': np.concatenate([[current[value_col].sum()]] + [t[4] for t in tiers]),
+        'depth': np.concatenate([[0]] + [np.full(len(t[1]), t[0]) for t in tiers]),
+    }
+
+
+def cycle_colors(values, palette, highlight, root_color):
+    """Per-node colours for build_hierarchy() output, without a per-node loop.
+
+    The root gets `root_color` and the largest positive non-root node(s) `highlight`;
+    every other node takes the next `palette` entry in order.
+    """
+    values = np.asarray(values, dtype=float)
+    colors = np.empty(len(values), dtype=object)
+    if not len(values):
+        return colors
+    colors[0] = root_color
+    rest = values[1:]
+    top = (rest == rest.max()) & (rest > 0) if len(rest) else np.zeros(0, dtype=bool)
+    order = np.cumsum(~top) - 1
+    colors[1:] = np.where(top, highlight, np.asarray(palette, dtype=object)[order % len(palette)])
+    return colors
@@ -0,0 +1,75 @@
+import os
+import threading
+
+
+def file_signature(paths):
+    """(path, mtime_ns, size) of each of `paths` that exists; changes whenever one is rewritten."""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class HotReloader:
+    """Serves the latest result of `load()`, reloading it in the background when `paths` change.
+
+    The first current() call loads inline (and raises if that fails, so the next call
+    tries again). After that a change to any watched file starts a single background
+    reload while current() keeps returning the previous snapshot, which is swapped out
+    only once the new one has loaded completely. A failed reload, e.g. of a file still
+    being written, is reported and leaves the previous snapshot in place until the
+    files change again.
+    """
+
+    def __init__(self, load, paths):
+        self._load = load
+        self._paths = list(paths)
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._signature = None
+        self._thread = None
+        self.reloads = 0
+        self.last_error = None
+
+    @property
+    def reloading(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def current(self):
+        signature = file_signature(self._paths)
+        with self._lock:
+            if self._snapshot is None:
+                # Concurrent first callers wait for this one load instead of starting their own
+                self._snapshot = self._load()
+                self._signature = signature
+                return self._snapshot
+            if signature != self._signature and not self.reloading:
+                self._thread = threading.Thread(target=self._reload, args=(signature,), daemon=True)
+                self._thread.start()
+            return self._snapshot
+
+    def wait(self, timeout=None):
+        """Block until a background reload in progress, if any, has finished."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _reload(self, signature):
+        # The signature is taken before loading, so a rewrite during the load triggers another one
+        try:
+            snapshot = self._load()
+        except Exception as e:
+            print(f"Reload failed, still serving the previous snapshot: {e}")
+            with self._lock:
+                self._signature = signature
+                self.last_error = e
+            return
+        with self._lock:
+            self._snapshot = snapshot
+            self._signature = signature
+            self.reloads += 1
+            self.last_error = None
@@ -0,0 +1,185 @@
+import time
+
+from tariff_db import DEFAULT_DB_PATH, HYPOTHESES, connect, print_report, run_hypotheses, table_version
+
+# Summary tables behind the hypotheses: group key and the additive measures kept per group.
+# Averages are stored as a sum and a count, so both can simply be added to on refresh.
+SUMMARY_TABLES = {
+    "hv_product": ("product_name", {
+        "n_price_before": "COUNT(price_before_USD)",
+        "sum_price_before": "SUM(price_before_USD)",
+        "n_price_after": "COUNT(price_after_USD)",
+        "sum_price_after": "SUM(price_after_USD)",
+        "n_increase": "COUNT(price_after_USD - price_before_USD)",
+        "sum_increase": "SUM(price_after_USD - price_before_USD)",
+        "n_tariff": "COUNT(tariff_pct)",
+        "sum_tariff": "SUM(tariff_pct)",
+        "units_before": "SUM(units_sold_before)",
+        "units_after": "SUM(units_sold_after)",
+    }),
+    "hv_country": ("country", {
+        "units_before": "SUM(units_sold_before)",
+        "units_after": "SUM(units_sold_after)",
+    }),
+    "hv_product_type": ("product_type", {
+        "n_price_before": "COUNT(price_before_USD)",
+        "sum_price_before": "SUM(price_before_USD)",
+        "n_price_after": "COUNT(price_after_USD)",
+        "sum_price_after": "SUM(price_after_USD)",
+        "n_pct_increase": "COUNT(CAST(price_after_USD - price_before_USD AS REAL) / price_before_USD)",
+        "sum_pct_increase": "SUM(CAST(price_after_USD - price_before_USD AS REAL) / price_before_USD * 100)",
+    }),
+}
+
+# Table version and last tariff_impact rowid the summary tables have absorbed
+STATE_TABLE = "hv_state"
+
+# Stored group key of rows with a blank key. ON CONFLICT never matches NULL keys, so NULL
+# is kept out of the primary key; load_csv stores blank text as NULL, so '' is free.
+BLANK_KEY = "''"
+
+# The hypotheses of tariff_db.HYPOTHESES answered from the summary tables: same names,
+# columns and order, but reading a row per group instead of scanning every line
+VIEW_QUERIES = dict(zip(HYPOTHESES, [
+    """
+        SELECT
+            NULLIF(product_name, '') AS product_name,
+            sum_price_before / n_price_before AS avg_price_before_USD,
+            sum_price_after / n_price_after AS avg_price_after_USD,
+            sum_increase / n_increase AS avg_price_increase
+        FROM hv_product
+        ORDER BY avg_price_increase DESC""",
+    """
+        SELECT
+            NULLIF(product_name, '') AS product_name,
+            units_before AS total_units_before,
+            units_after AS total_units_after,
+            units_after - units_before AS units_difference
+        FROM hv_product
+        ORDER BY units_difference ASC""",
+    """
+        SELECT
+            NULLIF(country, '') AS country,
+            units_before AS total_units_before,
+            units_after AS total_units_after,
+            units_after - units_before AS units_difference
+        FROM hv_country
+        ORDER BY units_difference ASC""",
+    """
+        SELECT
+            NULLIF(product_type, '') AS product_type,
+            sum_price_before / n_price_before AS avg_price_before_USD,
+            sum_price_after / n_price_after AS avg_price_after_USD,
+            sum_pct_increase / n_pct_increase AS avg_price_pct_increase
+        FROM hv_product_type
+        WHERE product_type = 'Electronics'""",
+    """
+        SELECT
+            NULLIF(product_name, '') AS product_name,
+            sum_tariff / n_tariff AS avg_tariff_pct,
+            units_before AS total_units_before,
+            units_after AS total_units_after,
+            units_after - units_before AS units_difference
+        FROM hv_product
+        ORDER BY avg_tariff_pct DESC, units_difference ASC""",
+    """
+        SELECT
+            NULLIF(product_name, '') AS product_name,
+            units_before AS total_units_before,
+            units_after AS total_units_after,
+            units_after - units_before AS units_difference
+        FROM hv_product
+        ORDER BY units_difference ASC
+        LIMIT 10""",
+    """
+        SELECT
+            NULLIF(product_name, '') AS product_name,
+            units_before AS total_units_before,
+            units_after AS total_units_after,
+            CASE
+                WHEN units_before = 0 THEN NULL
+                ELSE CAST((units_after - units_before) AS REAL) / units_before * 100
+            END AS pct_change_units_sold
+        FROM hv_product
+        ORDER BY pct_change_units_sold ASC""",
+]))
+
+
+def _add(column):
+    # SUM over no values is NULL, so adding to or from a NULL sum keeps the other side
+    return f"{column} = CASE WHEN excluded.{column} IS NULL THEN {column} " \
+           f"ELSE coalesce({column}, 0) + excluded.{column} END"
+
+
+def _create_tables(conn):
+    for table, (key, measures) in SUMMARY_TABLES.items():
+        # Untyped measures keep SUM's own type; NUMERIC would turn a whole float sum into an integer
+        columns = ", ".join([f"{key} TEXT NOT NULL PRIMARY KEY"] + list(measures))
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} (table_version INTEGER, last_rowid INTEGER)")
+
+
+def refresh_views(conn, rebuild=False):
+    """Bring the summary tables up to date with `tariff_impact`; returns a dict describing the refresh.
+
+    Only rows appended since the last refresh (rowid above the stored high-water mark)
+    are grouped and added onto the existing groups, so the cost follows the new rows
+    rather than the table. A full reload of the table (see tariff_db.table_version), or
+    `rebuild`, starts the summaries over from the first row; rows changed or deleted in
+    place need `rebuild` too.
+    """
+    start = time.perf_counter()
+    result = {'rows': 0, 'rebuilt': False, 'seconds': 0.0}
+    with conn:
+        _create_tables(conn)
+        version = table_version(conn)
+        state = conn.execute(f"SELECT table_version, last_rowid FROM {STATE_TABLE}").fetchone()
+        last_rowid = state[1] if state else 0
+        # Summaries written before blank keys were stored as BLANK_KEY may hold NULL groups
+        null_keys = any(conn.execute(f"SELECT 1 FROM {table} WHERE {key} IS NULL LIMIT 1").fetchone()
+                        for table, (key, _) in SUMMARY_TABLES.items())
+        if rebuild or state is None or state[0] != version or null_keys:
+            for table in SUMMARY_TABLES:
+                conn.execute(f"DROP TABLE {table}")
+            _create_tables(conn)
+            last_rowid = 0
+            result['rebuilt'] = True
+
+        high, rows = conn.execute(
+            "SELECT max(rowid), count(*) FROM tariff_impact WHERE rowid > ?", (last_rowid,)).fetchone()
+        if rows:
+            for table, (key, measures) in SUMMARY_TABLES.items():
+                conn.execute(
+                    f"INSERT INTO {table} ({key}, {', '.join(measures)}) "
+                    f"SELECT coalesce({key}, {BLANK_KEY}), {', '.join(measures.values())} FROM tariff_impact "
+                    f"WHERE rowid > ? AND rowid <= ? GROUP BY 1 "
+                    f"ON CONFLICT ({key}) DO UPDATE SET {', '.join(_add(name) for name in measures)}",
+                    (last_rowid, high))
+            last_rowid = high
+        conn.execute(f"DELETE FROM {STATE_TABLE}")
+        conn.execute(f"INSERT INTO {STATE_TABLE} VALUES (?, ?)", (version, last_rowid))
+    result['rows'] = rows
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def hypothesis_results(conn, refresh=True):
+    """Per-hypothesis dicts of name, result frame and seconds, as tariff_db.run_hypotheses, from the summary tables."""
+    if refresh:
+        refresh_views(conn)
+    return run_hypotheses(conn, VIEW_QUERIES)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Refresh the hypothesis summary tables and query them.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite database loaded by tariff_db.py")
+    parser.add_argument("--rebuild", action="store_true", help="recompute the summaries from every row")
+    parser.add_argument("--rows", type=int, default=5, help="result rows to print per query (0 for timings only)")
+    args = parser.parse_args()
+    conn = connect(args.db)
+    refresh = refresh_views(conn, rebuild=args.rebuild)
+    action = "Rebuilt" if refresh['rebuilt'] else "Refreshed"
+    print(f"{action} the hypothesis summaries with {refresh['rows']:,} new rows in {refresh['seconds']:.2f}s.")
+    print_report(hypothesis_results(conn, refresh=False), args.rows)
+    conn.close()
@@ -0,0 +1,308 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pandas as pd
+from matplotlib import rc_context
+from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.figure import Figure
+from PIL import Image
+
+from data_store import ENRICHED_CSV, read_enriched
+
+DEFAULT_OUTPUT_DIR = "Source"
+# Bump to re-render every chart after changing how they are drawn
+CHARTS_VERSION = 1
+# PNG text chunk holding the hash of the data a chart was rendered from
+HASH_KEY = "Data Hash"
+
+# Palette and theme of Visualization.ipynb, where these charts were first exported
+PALETTE = ["#D7520A", "#E89528", "#47622B", "#174B4C", "#D0E8C4"]
+STYLE = {
+    'axes.facecolor': '#f7f7fa',
+    'figure.facecolor': '#f7f7fa',
+    'axes.edgecolor': '#e0e0e0',
+    'axes.labelcolor': '#333333',
+    'xtick.color': '#333333',
+    'ytick.color': '#333333',
+    'axes.grid': True,
+    'axes.axisbelow': True,
+    'grid.color': '#cccccc',
+    'font.size': 10,
+}
+
+
+def _heatmap(fig, ax, matrix, fmt, cmap, cbar_label=None):
+    image = ax.imshow(matrix.to_numpy(dtype=float), aspect='auto', cmap=cmap)
+    ax.grid(False)
+    ax.set_xticks(range(matrix.shape[1]), matrix.columns)
+    ax.set_yticks(range(matrix.shape[0]), matrix.index)
+    for (i, j), value in np.ndenumerate(matrix.to_numpy()):
+        # Light text on dark cells, judged by the cell colour's luminance
+        r, g, b, _ = image.cmap(image.norm(value))
+        dark = 0.299 * r + 0.587 * g + 0.114 * b < 0.6
+        ax.text(j, i, format(value, fmt), ha='center', va='center', color='white' if dark else '#333333')
+    bar = fig.colorbar(image, ax=ax)
+    if cbar_label:
+        bar.set_label(cbar_label)
+
+
+def _grouped(df, key, columns, how, sort=True):
+    # Categorical keys would come back in dictionary order; plot them by name
+    out = df.groupby(key, observed=True, sort=False)[columns].agg(how)
+    out.index = out.index.astype(str)
+    return out.sort_index() if sort else out
+
+
+def _grouped_bars(ax, frame, labels, colors, horizontal):
+    # One bar per column of `frame` within each index category, like seaborn's hue
+    width = 0.8 / frame.shape[1]
+    positions = np.arange(len(frame))
+    for k, (column, label, color) in enumerate(zip(frame.columns, labels, colors)):
+        offset = positions - 0.4 + width * (k + 0.5)
+        if horizontal:
+            ax.barh(offset, frame[column], height=width, color=color, label=label)
+        else:
+            ax.bar(offset, frame[column], width=width, color=color, label=label)
+    if horizontal:
+        ax.set_yticks(positions, frame.index)
+        ax.invert_yaxis()
+    else:
+        ax.set_xticks(positions, frame.index)
+
+
+def _price_matrix(df):
+    prices = _grouped(df, "product_name", ["price_before_USD", "price_after_USD"], "mean").round(2)
+    prices["pct_change"] = ((prices["price_after_USD"] - prices["price_before_USD"]) / prices["price_before_USD"] * 100).round(2)
+    fig = Figure(figsize=(10, max(6, len(prices) * 0.4)))
+    ax = fig.subplots()
+    _heatmap(fig, ax, prices, ".2f", LinearSegmentedColormap.from_list("custom_cmap", PALETTE, N=256), 'Value')
+    ax.set_title("Product Price Matrix: Before, After, and % Change")
+    ax.set_ylabel("Product Name")
+    ax.set_xlabel("Metric")
+    return fig
+
+
+def _price_increase(df):
+    prices = _grouped(df, "product_name", ["price_before_USD", "price_after_USD"], "mean").round(2).reset_index()
+    prices["pct_change"] = ((prices["price_after_USD"] - prices["price_before_USD"]) / prices["price_before_USD"] * 100).round(2)
+    prices = prices.sort_values("pct_change", ascending=False)
+    n = len(prices)
+    fig = Figure(figsize=(12, 8))
+    ax = fig.subplots()
+    ax.barh(prices["product_name"], prices["price_before_USD"],
+            color=[PALETTE[i % len(PALETTE)] for i in range(n)], label="Before Tariff")
+    ax.barh(prices["product_name"], prices["price_after_USD"] - prices["price_before_USD"], left=prices["price_before_USD"],
+            color=[PALETTE[(i + 1) % len(PALETTE)] for i in range(n)], label="Increase After Tariff")
+    for i, (after, pct) in enumerate(zip(prices["price_after_USD"], prices["pct_change"])):
+        ax.text(after + 0.5, i, f"{pct:+.1f}%", va="center", fontsize=9, color="#333333")
+    ax.set_xlabel("Price in USD")
+    ax.set_ylabel("Product")
+    ax.set_title("Average Price Before and After Tariff by Product\n(With Percentage Change)")
+    ax.legend(loc="lower right")
+    return fig
+
+
+def _price_before_after(df):
+    prices = _grouped(df, "product_name", ["price_before_USD", "price_after_USD"], "mean")
+    prices = prices.loc[prices.mean(axis=1).sort_values(ascending=False).index]
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    _grouped_bars(ax, prices, ["price_before_USD", "price_after_USD"], PALETTE[:2], horizontal=True)
+    ax.legend(title="Price Type")
+    ax.set_title("Price Before and After Tariff (Sorted High to Low)")
+    ax.set_ylabel("Product")
+    ax.set_xlabel("Price in USD")
+    return fig
+
+
+def _units_by_product(df):
+    units = _grouped(df, "product_name", ["units_sold_before", "units_sold_after"], "mean", sort=False)
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    _grouped_bars(ax, units, ["units_sold_before", "units_sold_after"], PALETTE[:2], horizontal=True)
+    ax.legend(title="Period")
+    ax.set_title("Units Sold: Before vs After Tariff")
+    ax.set_xlabel("Units Sold")
+    ax.set_ylabel("Product")
+    return fig
+
+
+def _price_change_by_type(df):
+    diff = _grouped(df.assign(price_diff=df["price_after_USD"] - df["price_before_USD"]), "product_type", "price_diff", "mean").sort_values()
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.hlines(diff.index, 0, diff.to_numpy(), color=PALETTE[1], linewidth=2, zorder=2)
+    ax.scatter(diff.to_numpy(), diff.index, color=PALETTE[0], s=100, zorder=3)
+    ax.axvline(0, color=PALETTE[3], linestyle="--", zorder=1)
+    ax.set_title("Average Price Change After Tariff by Product Type (Slope Chart)")
+    ax.set_xlabel("Average Price Difference (USD)")
+    ax.set_ylabel("Product Type")
+    return fig
+
+
+def _price_change_by_country(df):
+    prices = _grouped(df, "country", ["price_before_USD", "price_after_USD"], "mean")
+    pct = ((prices["price_after_USD"] - prices["price_before_USD"]) / prices["price_before_USD"] * 100).sort_values(ascending=False)
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    ax.barh(pct.index, pct.to_numpy(), color=[PALETTE[i % len(PALETTE)] for i in range(len(pct))])
+    ax.invert_yaxis()
+    ax.axvline(0, color=PALETTE[3], linestyle="--")
+    ax.set_title("Percentage Change in Average Product Price by Country (After Tariff)")
+    ax.set_xlabel("Percentage Change (%)")
+    ax.set_ylabel("Country")
+    return fig
+
+
+def _price_distribution(df):
+    columns = ["price_before_USD", "price_after_USD"]
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    parts = ax.violinplot([df[c].dropna().to_numpy(dtype=float) for c in columns], showmedians=True)
+    for body, color in zip(parts['bodies'], PALETTE[:2]):
+        body.set_facecolor(color)
+        body.set_edgecolor('#333333')
+        body.set_alpha(0.9)
+    for lines in ('cmins', 'cmaxes', 'cbars', 'cmedians'):
+        parts[lines].set_color('#333333')
+    ax.set_xticks([1, 2], columns)
+    ax.set_title("Distribution of Product Prices: Before vs After Tariff")
+    ax.set_ylabel("Price (USD)")
+    return fig
+
+
+def _units_by_type(df):
+    units = _grouped(df, "product_type", ["units_sold_before", "units_sold_after"], "sum")
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    _grouped_bars(ax, units, ["units_sold_before", "units_sold_after"], PALETTE[:2], horizontal=False)
+    ax.legend(title="Period")
+    ax.set_title("Units Sold by Product Type (Before & After Tariff)")
+    ax.set_ylabel("Units Sold")
+    ax.set_xlabel("Product Type")
+    return fig
+
+
+def _units_heatmap(df):
+    units = _grouped(df, "product_type", ["units_sold_before", "units_sold_after"], "sum")
+    # A missing count loads the column as floats; the sums are whole either way
+    units = units.astype("Int64").rename(columns={"units_sold_before": "Before Tariff", "units_sold_after": "After Tariff"})
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    cmap = LinearSegmentedColormap.from_list("custom_cmap", ["#47622B", "#174B4C", "#E89528", "#D7520A", "#D0E8C4"], N=256)
+    _heatmap(fig, ax, units, "d", cmap)
+    ax.set_title("Heatmap of Units Sold by Product Type and Period")
+    ax.set_ylabel("Product Type")
+    ax.set_xlabel("Period")
+    return fig
+
+
+# Output file -> (renderer, columns it reads); a chart is re-rendered only when those columns change
+LEGACY_CHARTS = {
+    "Product Price Comparation.png": (_price_matrix, ["product_name", "price_before_USD", "price_after_USD"]),
+    "Averange Price Before and After Tariff.png": (_price_increase, ["product_name", "price_before_USD", "price_after_USD"]),
+    "Price Before and After Tariff.png": (_price_before_after, ["product_name", "price_before_USD", "price_after_USD"]),
+    "Units Sold Before vs After Tariff.png": (_units_by_product, ["product_name", "units_sold_before", "units_sold_after"]),
+    "Average Price Change After Tariff by Product Type.png": (_price_change_by_type, ["product_type", "price_before_USD", "price_after_USD"]),
+    "Percentage Change in Average Product Price by Country.png": (_price_change_by_country, ["country", "price_before_USD", "price_after_USD"]),
+    "Distribution of Product Prices Before vs After Tariff.png": (_price_distribution, ["price_before_USD", "price_after_USD"]),
+    "Units Sold by Product Type (Before & After Tariff.png": (_units_by_type, ["product_type", "units_sold_before", "units_sold_after"]),
+    "Heatmap of Units Sold by Product Type and Period.png": (_units_heatmap, ["product_type", "units_sold_before", "units_sold_after"]),
+}
+
+
+def data_hash(frame):
+    """Hash of a chart's input columns (values and order) and of CHARTS_VERSION."""
+    digest = hashlib.sha256(f"{CHARTS_VERSION}:{','.join(frame.columns)}".encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def stored_hash(path):
+    """Data hash recorded in a rendered chart, or None for a missing or foreign PNG."""
+    try:
+        with Image.open(path) as image:
+            return image.info.get(HASH_KEY)
+    except (FileNotFoundError, OSError):
+        return None
+
+
+def render_chart(name, frame, output_path, digest):
+    """Render one chart to `output_path`, tagged with `digest`.
+
+    Runs inside a worker process and never raises; the outcome is returned as a dict.
+    """
+    start = time.perf_counter()
+    result = {'chart': name, 'status': 'rendered', 'seconds': 0.0, 'error': None}
+    try:
+        with rc_context(STYLE):
+            fig = LEGACY_CHARTS[name][0](frame)
+            fig.tight_layout()
+            tmp_path = output_path + ".tmp"
+            fig.savefig(tmp_path, format="png", dpi=100, metadata={HASH_KEY: digest})
+        os.replace(tmp_path, output_path)
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def render_legacy_charts(csv_path=ENRICHED_CSV, output_dir=DEFAULT_OUTPUT_DIR, max_workers=None, force=False):
+    """Re-render the legacy charts whose input data changed, in parallel; returns per-chart results."""
+    start = time.perf_counter()
+    df = read_enriched(csv_path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    results, jobs = [], {}
+    for name, (_, columns) in LEGACY_CHARTS.items():
+        frame = df[columns]
+        digest = data_hash(frame)
+        output_path = os.path.join(output_dir, name)
+        if not force and stored_hash(output_path) == digest:
+            results.append({'chart': name, 'status': 'cached', 'seconds': 0.0, 'error': None})
+        else:
+            jobs[name] = (frame, output_path, digest)
+
+    if jobs:
+        print(f"Rendering {len(jobs)} of {len(LEGACY_CHARTS)} charts into {output_dir}...")
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(render_chart, name, *job): name for name, job in jobs.items()}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'chart': futures[future], 'status': 'failed', 'seconds': 0.0,
+                              'error': f"{type(e).__name__}: {e}"}
+                results.append(result)
+
+    results.sort(key=lambda r: r['chart'])
+    print_report(results, time.perf_counter() - start)
+    return results
+
+
+def print_report(results, elapsed):
+    width = max(len(r['chart']) for r in results)
+    for r in results:
+        detail = r['error'] if r['error'] else f"{r['seconds']:.2f}s" if r['status'] == 'rendered' else ""
+        print(f"  {r['chart']:<{width}}  {r['status']:<8}  {detail}")
+    counts = {status: sum(1 for r in results if r['status'] == status) for status in ('rendered', 'cached', 'failed')}
+    print(f"Charts complete: {counts['rendered']} rendered, {counts['cached']} cached, "
+          f"{counts['failed']} failed in {elapsed:.2f}s.")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Re-render the legacy dashboard charts from the enriched dataset.")
+    parser.add_argument("--input", default=ENRICHED_CSV)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="re-render even charts whose data is unchanged")
+    args = parser.parse_args()
+    results = render_legacy_charts(args.input, args.output, args.workers, args.force)
+    raise SystemExit(1 if any(r['error'] for r in results) else 0)
@@ -0,0 +1,53 @@
+import os
+
+import pandas as pd
+
+DEFAULT_MACRO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "macro_indicators.csv")
+MACRO_COLUMNS = ['GDP_Trillions', 'CPI_Pct']
+
+
+def macro_table_version(path=DEFAULT_MACRO_PATH):
+    """The `# version:` tag at the top of a macro reference file, or None."""
+    with open(path) as f:
+        for line in f:
+            if not line.startswith('#'):
+                break
+            if line[1:].strip().lower().startswith('version:'):
+                return line.split(':', 1)[1].strip()
+    return None
+
+
+def load_macro_table(path=DEFAULT_MACRO_PATH):
+    """Read the (country, year) macro reference table; each pair may appear only once."""
+    table = pd.read_csv(path, comment='#', skipinitialspace=True)
+    duplicated = table.duplicated(['country', 'year'])
+    if duplicated.any():
+        raise ValueError(f"Duplicate (country, year) rows in {path}: {table[duplicated].values.tolist()}")
+    return table.sort_values(['country', 'year']).reset_index(drop=True)
+
+
+def _dense_grid(table, years, columns):
+    """Expand the table to every (country, year) in range, carrying values forward (then back)."""
+    lo = int(min(table['year'].min(), years.min())) if len(years) else int(table['year'].min())
+    hi = int(max(table['year'].max(), years.max())) if len(years) else int(table['year'].max())
+    full = pd.MultiIndex.from_product([table['country'].unique(), range(lo, hi + 1)], names=['country', 'year'])
+    grid = table.set_index(['country', 'year'])[columns].reindex(full)
+    grid = grid.groupby(level='country').ffill().groupby(level='country').bfill().reset_index()
+    grid['year'] = grid['year'].astype('float64')
+    return grid
+
+
+def join_macro(df, table, year, columns=MACRO_COLUMNS):
+    """Attach `columns` from the macro table to `df` for each row's (country, year), in place.
+
+    `year` is a per-row integer Series aligned with `df`. The lookup is a single hash
+    merge against a small (country x year) grid, so it costs the same per row however
+    many vintages the table holds. Countries missing from the table get NaN.
+    """
+    years = year.dropna()
+    grid = _dense_grid(table, years, columns)
+    keys = pd.DataFrame({'country': df['country'].to_numpy(), 'year': year.to_numpy(dtype='float64')})
+    joined = keys.merge(grid, on=['country', 'year'], how='left', sort=False)
+    for col in columns:
+        df[col] = joined[col].to_numpy()
+    return df
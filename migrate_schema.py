@@ -0,0 +1,228 @@
+import time
+
+from tariff_db import DEFAULT_DB_PATH, connect, print_report, run_hypotheses
+
+# Normalized layout of tariff_impact: country and product dimensions, and a fact table of
+# integer keys, an ISO DATE and the measures. The product's type is repeated on the fact
+# rows so the (country, product_type, date) index can be range-scanned without a join.
+SCHEMA = [
+    """CREATE TABLE dim_country (
+        country_id INTEGER PRIMARY KEY,
+        country TEXT NOT NULL UNIQUE)""",
+    """CREATE TABLE dim_product_type (
+        product_type_id INTEGER PRIMARY KEY,
+        product_type TEXT NOT NULL UNIQUE)""",
+    """CREATE TABLE dim_product (
+        product_id INTEGER PRIMARY KEY,
+        product_name TEXT NOT NULL UNIQUE,
+        product_type_id INTEGER REFERENCES dim_product_type)""",
+    """CREATE TABLE fact_tariff_impact (
+        country_id INTEGER REFERENCES dim_country,
+        product_id INTEGER REFERENCES dim_product,
+        product_type_id INTEGER REFERENCES dim_product_type,
+        increase_date DATE CHECK (increase_date IS date(increase_date)),
+        price_before_USD REAL,
+        price_after_USD REAL,
+        tariff_pct REAL,
+        units_sold_before INTEGER,
+        units_sold_after INTEGER)""",
+]
+TABLES = ["fact_tariff_impact", "dim_product", "dim_product_type", "dim_country"]
+
+# The requested (country, product_type, date) index carries the unit columns too, so country
+# rollups and date slices are answered from it alone; the others mirror tariff_db.INDEXES
+INDEXES = {
+    "ix_fact_country_type_date": ("country_id", "product_type_id", "increase_date",
+                                  "units_sold_before", "units_sold_after"),
+    "ix_fact_product": ("product_id", "units_sold_before", "units_sold_after",
+                        "price_before_USD", "price_after_USD", "tariff_pct"),
+    "ix_fact_type": ("product_type_id", "price_before_USD", "price_after_USD"),
+}
+
+# increase_date of the current layout is 'dd/mm/yyyy' text
+ISO_DATE = "substr(increase_date, 7, 4) || '-' || substr(increase_date, 4, 2) || '-' || substr(increase_date, 1, 2)"
+
+# tariff_db.HYPOTHESES against the normalized tables: grouped on the integer keys, with
+# the names joined in afterwards onto one row per group
+NORMALIZED_HYPOTHESES = {
+    "H1 Tariffs increased average product prices": """
+        SELECT
+            p.product_name,
+            f.avg_price_before_USD,
+            f.avg_price_after_USD,
+            f.avg_price_increase
+        FROM (
+            SELECT
+                product_id,
+                AVG(price_before_USD) AS avg_price_before_USD,
+                AVG(price_after_USD) AS avg_price_after_USD,
+                AVG(price_after_USD - price_before_USD) AS avg_price_increase
+            FROM fact_tariff_impact
+            GROUP BY product_id) f
+        LEFT JOIN dim_product p USING (product_id)
+        ORDER BY avg_price_increase DESC""",
+    "H2 Unit sales decreased after tariffs": """
+        SELECT
+            p.product_name,
+            f.total_units_before,
+            f.total_units_after,
+            f.total_units_after - f.total_units_before AS units_difference
+        FROM (
+            SELECT
+                product_id,
+                SUM(units_sold_before) AS total_units_before,
+                SUM(units_sold_after) AS total_units_after
+            FROM fact_tariff_impact
+            GROUP BY product_id) f
+        LEFT JOIN dim_product p USING (product_id)
+        ORDER BY units_difference ASC""",
+    "H3 Tariff impact varies by country": """
+        SELECT
+            c.country,
+            f.total_units_before,
+            f.total_units_after,
+            f.total_units_after - f.total_units_before AS units_difference
+        FROM (
+            SELECT
+                country_id,
+                SUM(units_sold_before) AS total_units_before,
+                SUM(units_sold_after) AS total_units_after
+            FROM fact_tariff_impact
+            GROUP BY country_id) f
+        LEFT JOIN dim_country c USING (country_id)
+        ORDER BY units_difference ASC""",
+    "H4 Electronics had the highest price increase": """
+        SELECT
+            t.product_type,
+            AVG(f.price_before_USD) AS avg_price_before_USD,
+            AVG(f.price_after_USD) AS avg_price_after_USD,
+            AVG(CAST(f.price_after_USD - f.price_before_USD AS REAL) / f.price_before_USD * 100) AS avg_price_pct_increase
+        FROM fact_tariff_impact f
+        JOIN dim_product_type t USING (product_type_id)
+        WHERE t.product_type = 'Electronics'
+        GROUP BY t.product_type""",
+    "H5 Higher tariffs saw greater sales decreases": """
+        SELECT
+            p.product_name,
+            f.avg_tariff_pct,
+            f.total_units_before,
+            f.total_units_after,
+            f.total_units_after - f.total_units_before AS units_difference
+        FROM (
+            SELECT
+                product_id,
+                AVG(tariff_pct) AS avg_tariff_pct,
+                SUM(units_sold_before) AS total_units_before,
+                SUM(units_sold_after) AS total_units_after
+            FROM fact_tariff_impact
+            GROUP BY product_id) f
+        LEFT JOIN dim_product p USING (product_id)
+        ORDER BY avg_tariff_pct DESC, units_difference ASC""",
+    "H6 Products with sharp sales declines": """
+        SELECT
+            p.product_name,
+            f.total_units_before,
+            f.total_units_after,
+            f.total_units_after - f.total_units_before AS units_difference
+        FROM (
+            SELECT
+                product_id,
+                SUM(units_sold_before) AS total_units_before,
+                SUM(units_sold_after) AS total_units_after
+            FROM fact_tariff_impact
+            GROUP BY product_id) f
+        LEFT JOIN dim_product p USING (product_id)
+        ORDER BY units_difference ASC
+        LIMIT 10""",
+    "H7 Percent change in sales by product": """
+        SELECT
+            p.product_name,
+            f.total_units_before,
+            f.total_units_after,
+            CASE
+                WHEN f.total_units_before = 0 THEN NULL
+                ELSE CAST((f.total_units_after - f.total_units_before) AS REAL) / f.total_units_before * 100
+            END AS pct_change_units_sold
+        FROM (
+            SELECT
+                product_id,
+                SUM(units_sold_before) AS total_units_before,
+                SUM(units_sold_after) AS total_units_after
+            FROM fact_tariff_impact
+            GROUP BY product_id) f
+        LEFT JOIN dim_product p USING (product_id)
+        ORDER BY pct_change_units_sold ASC""",
+}
+
+
+def migrate(conn):
+    """Rebuild the normalized tables from the `tariff_impact` table in `conn`; returns a dict of counts.
+
+    Runs in one transaction and can be re-run after every reload: the normalized tables
+    are dropped and rebuilt, while `tariff_impact` itself is left in place for the bulk
+    loader and the hypothesis summaries. Raises ValueError, leaving the database as it
+    was, if a product is listed under several types or a date is not dd/mm/yyyy.
+    """
+    start = time.perf_counter()
+    with conn:
+        # Opened explicitly: sqlite3 would only begin one at the first INSERT, after the DDL
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        conflicts = [r[0] for r in conn.execute(
+            "SELECT product_name FROM tariff_impact GROUP BY product_name "
+            "HAVING COUNT(DISTINCT product_type) > 1 LIMIT 5")]
+        if conflicts:
+            raise ValueError(f"Products listed under several product types: {conflicts}")
+        bad_dates = [r[0] for r in conn.execute(
+            f"SELECT increase_date FROM tariff_impact WHERE increase_date IS NOT NULL "
+            f"AND ({ISO_DATE}) IS NOT date({ISO_DATE}) LIMIT 5")]
+        if bad_dates:
+            raise ValueError(f"Dates not in dd/mm/yyyy format: {bad_dates}")
+
+        for table in TABLES:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.execute("INSERT INTO dim_country (country) "
+                     "SELECT DISTINCT country FROM tariff_impact WHERE country IS NOT NULL ORDER BY country")
+        conn.execute("INSERT INTO dim_product_type (product_type) "
+                     "SELECT DISTINCT product_type FROM tariff_impact WHERE product_type IS NOT NULL ORDER BY product_type")
+        conn.execute("""
+            INSERT INTO dim_product (product_name, product_type_id)
+            SELECT r.product_name, t.product_type_id
+            FROM (SELECT product_name, MAX(product_type) AS product_type FROM tariff_impact
+                  WHERE product_name IS NOT NULL GROUP BY product_name ORDER BY product_name) r
+            LEFT JOIN dim_product_type t USING (product_type)""")
+        conn.execute(f"""
+            INSERT INTO fact_tariff_impact
+            SELECT c.country_id, p.product_id, t.product_type_id, {ISO_DATE},
+                   price_before_USD, price_after_USD, tariff_pct, units_sold_before, units_sold_after
+            FROM tariff_impact r
+            LEFT JOIN dim_country c USING (country)
+            LEFT JOIN dim_product p USING (product_name)
+            LEFT JOIN dim_product_type t ON t.product_type = r.product_type
+            ORDER BY r.rowid""")
+        for name, columns in INDEXES.items():
+            conn.execute(f"CREATE INDEX {name} ON fact_tariff_impact ({', '.join(columns)})")
+        conn.execute("ANALYZE")
+
+        counts = {table: conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0] for table in TABLES}
+        source_rows = conn.execute("SELECT count(*) FROM tariff_impact").fetchone()[0]
+        if counts["fact_tariff_impact"] != source_rows:
+            raise ValueError(f"Migrated {counts['fact_tariff_impact']:,} of {source_rows:,} rows")
+    counts['seconds'] = time.perf_counter() - start
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Migrate tariff_impact into the normalized, indexed schema.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite database loaded by tariff_db.py")
+    parser.add_argument("--rows", type=int, default=0, help="result rows to print per hypothesis query")
+    args = parser.parse_args()
+    conn = connect(args.db)
+    counts = migrate(conn)
+    print(f"Migrated {counts['fact_tariff_impact']:,} rows, {counts['dim_country']} countries, "
+          f"{counts['dim_product']} products and {counts['dim_product_type']} product types in {counts['seconds']:.2f}s.")
+    print_report(run_hypotheses(conn, NORMALIZED_HYPOTHESES), args.rows)
+    conn.close()
@@ -0,0 +1,197 @@
+import csv
+import sqlite3
+import time
+
+import pandas as pd
+
+RAW_CSV = "Tariff_Impact_Analysis_2025.csv"
+DEFAULT_DB_PATH = "tariff.sqlite"
+
+# Table column, raw CSV column and SQLite type; the layout of `Structure of DBS.sql`
+TABLE_COLUMNS = [
+    ("country", "country", "TEXT"),
+    ("product_name", "product_name", "TEXT"),
+    ("product_type", "product_type", "TEXT"),
+    ("price_before_USD", "price_before_USD", "REAL"),
+    ("price_after_USD", "price_after_USD", "REAL"),
+    ("tariff_pct", "tariff_pct", "REAL"),
+    ("increase_date", "date", "TEXT"),
+    ("units_sold_before", "units_sold_before", "INTEGER"),
+    ("units_sold_after", "units_sold_after", "INTEGER"),
+]
+
+# Covering indexes: every hypothesis groups by product or country, or filters on product
+# type, over a few measure columns, so each is answered from one index alone in group order
+INDEXES = {
+    "ix_tariff_impact_product": ("product_name", "units_sold_before", "units_sold_after",
+                                 "price_before_USD", "price_after_USD", "tariff_pct"),
+    "ix_tariff_impact_country": ("country", "units_sold_before", "units_sold_after"),
+    "ix_tariff_impact_type": ("product_type", "price_before_USD", "price_after_USD"),
+}
+
+# The seven hypothesis queries of `Structure of DBS.sql`, in SQLite's dialect
+HYPOTHESES = {
+    "H1 Tariffs increased average product prices": """
+        SELECT
+            product_name,
+            AVG(price_before_USD) AS avg_price_before_USD,
+            AVG(price_after_USD) AS avg_price_after_USD,
+            AVG(price_after_USD - price_before_USD) AS avg_price_increase
+        FROM tariff_impact
+        GROUP BY product_name
+        ORDER BY avg_price_increase DESC""",
+    "H2 Unit sales decreased after tariffs": """
+        SELECT
+            product_name,
+            SUM(units_sold_before) AS total_units_before,
+            SUM(units_sold_after) AS total_units_after,
+            SUM(units_sold_after) - SUM(units_sold_before) AS units_difference
+        FROM tariff_impact
+        GROUP BY product_name
+        ORDER BY units_difference ASC""",
+    "H3 Tariff impact varies by country": """
+        SELECT
+            country,
+            SUM(units_sold_before) AS total_units_before,
+            SUM(units_sold_after) AS total_units_after,
+            SUM(units_sold_after) - SUM(units_sold_before) AS units_difference
+        FROM tariff_impact
+        GROUP BY country
+        ORDER BY units_difference ASC""",
+    "H4 Electronics had the highest price increase": """
+        SELECT
+            product_type,
+            AVG(price_before_USD) AS avg_price_before_USD,
+            AVG(price_after_USD) AS avg_price_after_USD,
+            AVG(CAST(price_after_USD - price_before_USD AS REAL) / price_before_USD * 100) AS avg_price_pct_increase
+        FROM tariff_impact
+        WHERE product_type = 'Electronics'
+        GROUP BY product_type""",
+    "H5 Higher tariffs saw greater sales decreases": """
+        SELECT
+            product_name,
+            AVG(tariff_pct) AS avg_tariff_pct,
+            SUM(units_sold_before) AS total_units_before,
+            SUM(units_sold_after) AS total_units_after,
+            SUM(units_sold_after) - SUM(units_sold_before) AS units_difference
+        FROM tariff_impact
+        GROUP BY product_name
+        ORDER BY avg_tariff_pct DESC, units_difference ASC""",
+    "H6 Products with sharp sales declines": """
+        SELECT
+            product_name,
+            SUM(units_sold_before) AS total_units_before,
+            SUM(units_sold_after) AS total_units_after,
+            SUM(units_sold_after) - SUM(units_sold_before) AS units_difference
+        FROM tariff_impact
+        GROUP BY product_name
+        ORDER BY units_difference ASC
+        LIMIT 10""",
+    "H7 Percent change in sales by product": """
+        SELECT
+            product_name,
+            SUM(units_sold_before) AS total_units_before,
+            SUM(units_sold_after) AS total_units_after,
+            CASE
+                WHEN SUM(units_sold_before) = 0 THEN NULL
+                ELSE CAST((SUM(units_sold_after) - SUM(units_sold_before)) AS REAL) / SUM(units_sold_before) * 100
+            END AS pct_change_units_sold
+        FROM tariff_impact
+        GROUP BY product_name
+        ORDER BY pct_change_units_sold ASC""",
+}
+
+
+def connect(db_path=DEFAULT_DB_PATH):
+    return sqlite3.connect(db_path)
+
+
+def create_indexes(conn, analyze=True):
+    for name, columns in INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON tariff_impact ({', '.join(columns)})")
+    if analyze:
+        # Planner statistics, so the covering indexes are picked over a table scan
+        conn.execute("ANALYZE")
+
+
+def table_version(conn):
+    """Bumped by every full reload of `tariff_impact`, so tables derived from it can tell it was replaced."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def load_csv(conn, csv_path=RAW_CSV, batch=100_000, append=False):
+    """(Re)create `tariff_impact` from raw CSV `csv_path` and index it; returns the rows loaded.
+
+    Rows are streamed straight from the csv module into executemany within a single
+    transaction, and the indexes are built once after the load rather than per row.
+    Numeric text is stored as numbers by the columns' type affinity. With `append` the
+    rows are added to the existing table instead, which keeps its indexes up to date.
+    """
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    conn.execute("PRAGMA synchronous = OFF")
+    columns = ", ".join(f"{name} {sql_type}" for name, _, sql_type in TABLE_COLUMNS)
+    placeholders = ", ".join("?" * len(TABLE_COLUMNS))
+    rows = 0
+    with conn, open(csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        positions = [header.index(source) for _, source, _ in TABLE_COLUMNS]
+        if not append:
+            conn.execute("DROP TABLE IF EXISTS tariff_impact")
+            conn.execute(f"PRAGMA user_version = {table_version(conn) + 1}")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS tariff_impact ({columns})")
+        insert = f"INSERT INTO tariff_impact VALUES ({placeholders})"
+        chunk = []
+        for record in reader:
+            chunk.append([record[i] or None for i in positions])
+            if len(chunk) == batch:
+                conn.executemany(insert, chunk)
+                rows += len(chunk)
+                chunk = []
+        conn.executemany(insert, chunk)
+        rows += len(chunk)
+        create_indexes(conn, analyze=not append)
+    conn.execute("PRAGMA synchronous = FULL")
+    return rows
+
+
+def run_hypotheses(conn, queries=HYPOTHESES):
+    """Run each query in `queries`; returns per-query dicts of name, result frame and seconds."""
+    results = []
+    for name, sql in queries.items():
+        start = time.perf_counter()
+        cursor = conn.execute(sql)
+        rows = cursor.fetchall()
+        seconds = time.perf_counter() - start
+        frame = pd.DataFrame(rows, columns=[d[0] for d in cursor.description])
+        results.append({'name': name, 'result': frame, 'seconds': seconds})
+    return results
+
+
+def print_report(results, show_rows=5):
+    width = max(len(r['name']) for r in results)
+    for r in results:
+        print(f"  {r['name']:<{width}}  {len(r['result']):>5,} rows  {r['seconds'] * 1e3:9.2f} ms")
+        if show_rows:
+            print(r['result'].head(show_rows).to_string(index=False))
+            print()
+    total = sum(r['seconds'] for r in results)
+    print(f"{len(results)} queries in {total * 1e3:.2f} ms.")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Load the raw tariff CSV into SQLite and run the seven hypothesis queries.")
+    parser.add_argument("--input", default=RAW_CSV, help="raw CSV to bulk-load")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite database file")
+    parser.add_argument("--append", action="store_true", help="add the rows to the existing table instead of replacing it")
+    parser.add_argument("--no-load", action="store_true", help="query the existing database without reloading it")
+    parser.add_argument("--rows", type=int, default=5, help="result rows to print per query (0 for timings only)")
+    args = parser.parse_args()
+    conn = connect(args.db)
+    if not args.no_load:
+        start = time.perf_counter()
+        loaded = load_csv(conn, args.input, append=args.append)
+        print(f"Loaded {loaded:,} rows from {args.input} into {args.db} in {time.perf_counter() - start:.2f}s.")
+    print_report(run_hypotheses(conn), args.rows)
+    conn.close()
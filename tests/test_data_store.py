@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+from conftest import ROOT
+from data_store import parquet_matches_csv, read_enriched
+from enrich_data import enrich_data
+
+RAW_CSV = os.path.join(ROOT, "Tariff_Impact_Analysis_2025.csv")
+
+
+@pytest.mark.parametrize("chunksize", [None, 100])
+def test_source_follows_contents_not_mtimes(tmp_path, chunksize):
+    store = str(tmp_path / "store.csv")
+    enrich_data(RAW_CSV, store, chunksize=chunksize)
+    assert parquet_matches_csv(store)
+
+    # A newer CSV with the same bytes, as after a fresh checkout, still loads the Parquet copy
+    os.utime(store, (os.path.getmtime(store) + 60,) * 2)
+    assert read_enriched(store)['country'].dtype == 'category'
+
+    # A --no-parquet run over other rows leaves a stale copy behind, however new its mtime
+    raw = tmp_path / "raw.csv"
+    raw.write_bytes(b"".join(open(RAW_CSV, 'rb').readlines()[:301]))
+    enrich_data(str(raw), store, write_parquet=False)
+    os.utime(str(tmp_path / "store.parquet"), (os.path.getmtime(store) + 60,) * 2)
+    assert not parquet_matches_csv(store)
+    df = read_enriched(store)
+    assert len(df) == 300 and df['country'].dtype == object
@@ -0,0 +1,87 @@
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from data_store import parquet_parts, read_cube, read_enriched
+from enrich_data import enrich_data, enrich_incremental
+
+RAW_CSV = os.path.join(ROOT, "Tariff_Impact_Analysis_2025.csv")
+
+
+@pytest.fixture
+def raw_with_blanks(tmp_path):
+    """The shipped raw CSV with unit counts blanked in the second 100-row chunk only."""
+    raw = pd.read_csv(RAW_CSV, dtype=str, keep_default_na=False)
+    raw.loc[105, 'units_sold_before'] = ""
+    raw.loc[150, 'units_sold_after'] = ""
+    path = tmp_path / "raw.csv"
+    raw.to_csv(path, index=False)
+    return path
+
+
+def enrich(input_path, output_path, **kwargs):
+    enrich_data(str(input_path), str(output_path), write_parquet=False, **kwargs)
+    return output_path.read_bytes()
+
+
+@pytest.mark.parametrize("chunksize", [100, 7, 10_000])
+def test_chunked_output_is_byte_identical(raw_with_blanks, tmp_path, chunksize):
+    whole = enrich(raw_with_blanks, tmp_path / "whole.csv")
+    chunked = enrich(raw_with_blanks, tmp_path / "chunked.csv", chunksize=chunksize)
+    assert chunked == whole
+
+
+def test_missing_units_stay_integers(raw_with_blanks, tmp_path):
+    enrich(raw_with_blanks, tmp_path / "chunked.csv", chunksize=100)
+    lines = (tmp_path / "chunked.csv").read_text().splitlines()
+    header = lines[0].split(',')
+    before = header.index('units_sold_before')
+    assert lines[1 + 105].split(',')[before] == ""
+    assert lines[1].split(',')[before] == "165"
+
+
+def with_units_after(line, units):
+    fields = line.rstrip(b"\n").split(b",")
+    fields[-3] = units
+    return b",".join(fields) + b"\n"
+
+
+def sorted_frame(df):
+    df = df.astype({c: object for c in df.columns if df[c].dtype == 'category'})
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+
+def raw_versions(lines):
+    """Successive raw files: pure appends, then a modified row, a deleted row and an append on top."""
+    appended = lines[:501] + lines[1:2]
+    modified = appended[:50] + [with_units_after(appended[50], b"1")] + appended[51:]
+    deleted = modified[:80] + modified[81:]
+    return {
+        'append': (appended, 2),
+        'modify': (modified, 1),
+        'delete': (deleted, 1),
+        'append after delete': (deleted + lines[501:560], 2),
+    }
+
+
+def test_incremental_runs_match_full_runs(tmp_path):
+    lines = open(RAW_CSV, 'rb').read().splitlines(keepends=True)
+    assert lines[0].rstrip().split(b",")[-3] == b"units_sold_after"
+    raw = tmp_path / "raw.csv"
+    raw.write_bytes(b"".join(lines[:401]))
+    store = tmp_path / "store.csv"
+    enrich_data(str(raw), str(store))
+
+    for name, (version, parts) in raw_versions(lines).items():
+        raw.write_bytes(b"".join(version))
+        enrich_incremental(str(raw), str(store))
+        full = tmp_path / f"full {name}.csv"
+        enrich_data(str(raw), str(full))
+
+        assert len(parquet_parts(str(tmp_path / "store.parquet"))) == parts, name
+        # Changed rows move to the end of the store, so rows are compared regardless of order
+        assert sorted(store.read_bytes().splitlines()) == sorted(full.read_bytes().splitlines()), name
+        pd.testing.assert_frame_equal(sorted_frame(read_enriched(str(store))), sorted_frame(read_enriched(str(full))))
+        pd.testing.assert_frame_equal(read_cube(str(store)), read_cube(str(full)), check_exact=True, obj=name)
@@ -0,0 +1,34 @@
+import os
+
+import pandas as pd
+
+from conftest import ROOT
+from hypothesis_views import hypothesis_results, refresh_views
+from tariff_db import connect, load_csv, run_hypotheses
+
+RAW_CSV = os.path.join(ROOT, "Tariff_Impact_Analysis_2025.csv")
+
+
+def assert_views_match_table(conn):
+    for table, views in zip(run_hypotheses(conn), hypothesis_results(conn)):
+        pd.testing.assert_frame_equal(views['result'], table['result'], obj=table['name'])
+
+
+def test_refresh_merges_blank_keys(tmp_path):
+    raw = pd.read_csv(RAW_CSV, dtype=str, keep_default_na=False)
+    conn = connect(str(tmp_path / "tariff.sqlite"))
+    raw[:300].to_csv(tmp_path / "initial.csv", index=False)
+    load_csv(conn, str(tmp_path / "initial.csv"))
+    assert_views_match_table(conn)
+
+    # Each append has rows with blank product, country and type keys
+    for i, rows in enumerate([raw[300:400].copy(), raw[400:500].copy()]):
+        rows.iloc[::7, rows.columns.get_loc('product_name')] = ""
+        rows.iloc[::11, rows.columns.get_loc('country')] = ""
+        rows.iloc[::13, rows.columns.get_loc('product_type')] = ""
+        path = tmp_path / f"append_{i}.csv"
+        rows.to_csv(path, index=False)
+        load_csv(conn, str(path), append=True)
+        assert refresh_views(conn)['rebuilt'] is False
+        assert_views_match_table(conn)
+    conn.close()
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from trade_rules import RULE_FIELDS, TradeRuleRegistry, load_rules
+
+RULES = [
+    # label, country, product_type, product_name, effective_from, effective_to
+    ("Section 301", "China", None, "Laptop", None, None),
+    ("Section 232", None, "Steel", None, None, None),
+    ("Quota", "China", None, None, "2020-01-01", "2020-12-31"),
+    ("Review", "China", "Electronics", None, "2020-06-01", None),
+    ("Sunset", "China", None, None, None, "2019-06-30"),
+]
+
+
+def registry(rules=RULES):
+    return TradeRuleRegistry(pd.DataFrame(rules, columns=RULE_FIELDS))
+
+
+def classify(reg, rows):
+    df = pd.DataFrame(rows, columns=['country', 'product_type', 'product_name', 'date'])
+    df['date'] = pd.to_datetime(df['date'])
+    return list(reg.classify(df))
+
+
+def test_overlapping_dated_rules():
+    rows = [("China", "Electronics", "Phone", date)
+            for date in ["2019-06-30", "2019-07-01", "2020-03-01", "2020-06-01", "2020-12-31", "2021-01-01"]]
+    assert classify(registry(), rows) == [
+        "Sunset", "Standard", "Quota", "Quota | Review", "Quota | Review", "Review",
+    ]
+
+
+def test_wildcard_and_exact_key_labels_in_rule_order():
+    rows = [("China", "Steel", "Laptop", "2018-01-01"),
+            ("Germany", "Steel", "Laptop", "2018-01-01"),
+            ("China", "Food", "Laptop", "2018-01-01"),
+            ("Germany", "Food", "Laptop", "2018-01-01")]
+    assert classify(registry(), rows) == ["Section 301 | Section 232 | Sunset", "Section 232", "Section 301 | Sunset",
+                                          "Standard"]
+    # Labels follow the rule file, not the order the rules happen to match in
+    reordered = registry([RULES[1], RULES[0]])
+    assert classify(reordered, rows[:1]) == ["Section 232 | Section 301"]
+
+
+def test_missing_date_matches_undated_rules_only():
+    rows = [("China", "Electronics", "Laptop", None), ("China", "Electronics", "Phone", None)]
+    assert classify(registry(), rows) == ["Section 301", "Standard"]
+
+
+def test_yaml_rules_match_csv_rules(tmp_path):
+    yaml = pytest.importorskip("yaml")
+    rules = pd.DataFrame(RULES, columns=RULE_FIELDS)
+    csv_path = tmp_path / "rules.csv"
+    rules.to_csv(csv_path, index=False)
+    yaml_path = tmp_path / "rules.yaml"
+    records = [{k: v for k, v in rule.items() if v is not None} for rule in rules.to_dict('records')]
+    yaml_path.write_text(yaml.safe_dump({'rules': records}))
+
+    from_yaml, from_csv = load_rules(str(yaml_path)), load_rules(str(csv_path))
+    assert from_yaml.fillna("").astype(str).equals(from_csv.fillna("").astype(str))
+    rows = [("China", "Electronics", "Laptop", date) for date in ["2019-01-01", "2020-07-01", None]]
+    assert classify(TradeRuleRegistry(from_yaml), rows) == classify(TradeRuleRegistry(from_csv), rows)
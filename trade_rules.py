@@ -0,0 +1,155 @@
+import os
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "trade_rules.csv")
+DEFAULT_LABEL = "Standard"
+KEY_FIELDS = ['country', 'product_type', 'product_name']
+RULE_FIELDS = ['label'] + KEY_FIELDS + ['effective_from', 'effective_to']
+
+
+def load_rules(path=DEFAULT_RULES_PATH):
+    """Read a rule table from CSV or YAML (a list of rules, optionally under a `rules:` key)."""
+    if path.lower().endswith(('.yaml', '.yml')):
+        import yaml
+        with open(path) as f:
+            data = yaml.safe_load(f) or []
+        if isinstance(data, dict):
+            data = data.get('rules', [])
+        rules = pd.DataFrame(data, columns=RULE_FIELDS)
+    else:
+        rules = pd.read_csv(path, dtype=str, comment='#', skipinitialspace=True)
+    return rules
+
+
+class TradeRuleRegistry:
+    """Trade list rules compiled into a wildcard hash index plus per-key date intervals.
+
+    Each rule maps (country, product_type, product_name) to a list label, with blank
+    fields acting as wildcards and an optional inclusive effective date range. Rows
+    matching several rules get every distinct label joined with " | " in rule-file
+    order; rows matching none are tagged "Standard". A row without a usable date
+    cannot be placed in any range, so it only matches undated rules.
+    """
+
+    def __init__(self, rules):
+        rules = rules.reindex(columns=RULE_FIELDS).reset_index(drop=True)
+        for col in ['label'] + KEY_FIELDS:
+            rules[col] = rules[col].map(lambda v: None if pd.isna(v) else (str(v).strip() or None)).astype(object)
+        if rules['label'].isna().any():
+            raise ValueError("Every trade rule needs a label")
+
+        self.labels = list(dict.fromkeys(rules['label']))
+        label_pos = {label: i for i, label in enumerate(self.labels)}
+        self._rule_label = rules['label'].map(label_pos).to_numpy()
+        self._rule_start = pd.to_datetime(rules['effective_from'], errors='coerce').to_numpy('datetime64[ns]')
+        self._rule_end = pd.to_datetime(rules['effective_to'], errors='coerce').to_numpy('datetime64[ns]')
+
+        # Hash index: (country, product_type, product_name) with None as wildcard -> rule ids
+        self._index = {}
+        for rule_id, key in enumerate(rules[KEY_FIELDS].itertuples(index=False, name=None)):
+            self._index.setdefault(key, []).append(rule_id)
+
+        self._combo_codes = {(): 0}
+        self._combo_labels = [DEFAULT_LABEL]
+        self._resolved = {}
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_RULES_PATH):
+        return cls(load_rules(path))
+
+    def __len__(self):
+        return len(self._rule_label)
+
+    def _combo_code(self, label_ids):
+        combo = tuple(sorted(set(label_ids)))
+        code = self._combo_codes.get(combo)
+        if code is None:
+            code = len(self._combo_labels)
+            self._combo_codes[combo] = code
+            self._combo_labels.append(" | ".join(self.labels[i] for i in combo))
+        return code
+
+    def resolve(self, key):
+        """Compile the interval index for one concrete key, memoised across calls.
+
+        Returns (breakpoints, codes, undated): rows dated before breakpoints[0] get
+        codes[0], rows in [breakpoints[i], breakpoints[i + 1]) get codes[i + 1], and so
+        on; rows with no date get `undated`, the code of the key's undated rules alone.
+        """
+        hit = self._resolved.get(key)
+        if hit is not None:
+            return hit
+
+        rule_ids = sorted({
+            rule_id
+            for variant in product(*[(v, None) if v is not None else (None,) for v in key])
+            for rule_id in self._index.get(variant, ())
+        })
+        starts = self._rule_start[rule_ids]
+        ends = self._rule_end[rule_ids] + np.timedelta64(1, 'D')
+        breakpoints = np.unique(np.concatenate([starts[~np.isnat(starts)], ends[~np.isnat(ends)]]))
+
+        # Evaluate the active rules once per segment rather than once per row
+        probes = np.concatenate([[np.datetime64('NaT', 'ns')], breakpoints])
+        codes = []
+        for i, probe in enumerate(probes):
+            active = []
+            for rule_id, start, end in zip(rule_ids, starts, ends):
+                if np.isnat(start) and np.isnat(end):
+                    active.append(rule_id)
+                elif i == 0:
+                    # Segment before the first breakpoint: only rules with no start date can apply
+                    if np.isnat(start):
+                        active.append(rule_id)
+                elif (np.isnat(start) or probe >= start) and (np.isnat(end) or probe < end):
+                    active.append(rule_id)
+            codes.append(self._combo_code(self._rule_label[active]))
+        undated = [rule_id for rule_id, start, end in zip(rule_ids, starts, ends) if np.isnat(start) and np.isnat(end)]
+
+        hit = (breakpoints, np.asarray(codes, dtype=np.int64), self._combo_code(self._rule_label[undated]))
+        self._resolved[key] = hit
+        return hit
+
+    def classify(self, df, date_col='date'):
+        """Return the trade list status for every row of `df` as an object Series."""
+        n = len(df)
+        combined = np.zeros(n, dtype=np.int64)
+        uniques = []
+        for col in KEY_FIELDS:
+            if col in df.columns:
+                codes, values = pd.factorize(df[col])
+            else:
+                codes, values = np.full(n, -1, dtype=np.int64), pd.Index([])
+            combined = combined * (len(values) + 1) + (codes + 1)
+            uniques.append([None] + list(values))
+        key_codes, key_values = pd.factorize(combined)
+
+        row_codes = np.zeros(n, dtype=np.int64)
+        dated_keys = {}
+        key_combo = np.zeros(len(key_values), dtype=np.int64)
+        for k, packed in enumerate(key_values):
+            parts = []
+            for values in reversed(uniques):
+                packed, pos = divmod(int(packed), len(values))
+                parts.append(values[pos])
+            breakpoints, codes, undated = self.resolve(tuple(reversed(parts)))
+            if len(breakpoints):
+                dated_keys[k] = (breakpoints, codes, undated)
+            else:
+                key_combo[k] = codes[0]
+        row_codes[:] = key_combo[key_codes]
+
+        if dated_keys:
+            dates = pd.to_datetime(df[date_col], dayfirst=True, errors='coerce').to_numpy('datetime64[ns]')
+            order = np.argsort(key_codes, kind='stable')
+            bounds = np.searchsorted(key_codes[order], np.arange(len(key_values) + 1))
+            for k, (breakpoints, codes, undated) in dated_keys.items():
+                rows = order[bounds[k]:bounds[k + 1]]
+                seg = np.searchsorted(breakpoints, dates[rows], side='right')
+                row_codes[rows] = np.where(np.isnat(dates[rows]), undated, codes[seg])
+
+        labels = np.array(self._combo_labels, dtype=object)
+        return pd.Series(labels[row_codes], index=df.index, name='Trade_List_Status')